@@ -1,307 +1,419 @@
-# config_manager.py
-import os
-import json
-import re
-import traceback
-import hashlib
-from datetime import datetime
-from typing import Dict, Any, Optional
-from PyQt5.QtCore import pyqtSignal, QObject
-import orjson  # لتحسين أداء JSON Parsing
-from pathlib import Path
-import logging
-import logging.handlers
-import shutil
-from threading import Lock  # لدعم multi-threading
-
-class ConfigManager(QObject):
-    """
-    كلاس لإدارة إعدادات التطبيق باستخدام ملف JSON.
-    يدعم تحميل، حفظ، وتحديث الإعدادات مع التحقق من الصحة، النسخ الاحتياطي، والتكامل مع الواجهة.
-    يضمن الاستقرار، الأمان، والأداء العالي لجميع وظائف البرنامج.
-    """
-    configUpdated = pyqtSignal()  # إشارة لإعلام المكونات بتحديث الإعدادات
-    statusUpdated = pyqtSignal(str)  # إشارة لتحديث حالة الواجهة
-
-    def __init__(self, app, config_file: str = "config.json", log_manager=None):
-        """
-        تهيئة ConfigManager مع التكامل مع التطبيق الرئيسي.
-
-        Args:
-            app: كائن SmartPosterApp للوصول إلى وظائف التطبيق.
-            config_file (str): مسار ملف الإعدادات (افتراضي: config.json).
-            log_manager: كائن LogManager لتسجيل الأحداث.
-        """
-        super().__init__()
-        self.app = app
-        self.base_dir = Path(os.path.dirname(os.path.abspath(__file__)))
-        self.config_file = self.base_dir / config_file
-        self.backup_dir = self.base_dir / "backups"
-        self.log_manager = log_manager
-        self.lock = Lock()  # لضمان عمليات كتابة آمنة في بيئة multi-threaded
-
-        if not self.log_manager:
-            raise ValueError("LogManager is required for ConfigManager")
-
-        # الإعدادات الافتراضية مع تحسينات
-        self.default_config: Dict[str, Any] = {
-            "2captcha_api_key": "",                  # مفتاح API مشفر
-            "default_delay": 5,                      # تأخير افتراضي (5-60 ثانية)
-            "max_retries": 3,                        # أقصى محاولات (1-10)
-            "proxies": [],                           # قائمة وكلاء
-            "custom_scripts": [
-                "Thanks for your comment! Contact us at 01225398839",
-                "For more info, call 01225398839",
-                "Great post! Reach out for details."
-            ],
-            "max_sessions": 5,                       # أقصى جلسات (1-10)
-            "add_hashtags": True,
-            "add_call_to_action": True,
-            "default_language": "en",
-            "max_group_members": 10000,              # أقصى أعضاء (100-1000000)
-            "use_access_token": False,
-            "app_id": "123456789012345",             # معرف تطبيق فيسبوك
-            "backup_config": True,
-            "chrome_path": "drivers/chrome.exe",
-            "chromedriver_path": "drivers/chromedriver.exe",
-            "mobile_size": "360x640",
-            "chrome_version": "133",
-            "post_delay": 10,                        # تأخير النشر (5-300 ثانية)
-            "stop_after_posts": 10,                  # إيقاف بعد (1-1000)
-            "predictive_ban_detection": True,
-            "proxy_rotation_enabled": True,
-            "auto_reply_enabled": True,
-            "auto_reply_interval": 120,              # فاصل رد (5-300 ثانية)
-            "phone_number": "01225398839",
-            "last_modified": None                    # تتبع آخر تعديل
-        }
-
-        # إعداد التسجيل مع log rotation
-        self.setup_logging()
-
-        try:
-            self.config = self.load_config()
-            self._log("ConfigManager initialized successfully", "Info")
-        except Exception as e:
-            error_message = f"Failed to initialize ConfigManager: {str(e)}\n{traceback.format_exc()}"
-            self._log(error_message, "Error")
-            self.config = self.default_config.copy()
-            self.save_config()
-
-    def setup_logging(self):
-        """إعداد التسجيل مع log rotation."""
-        logging.basicConfig(
-            filename=self.base_dir / "config_manager.log",
-            level=logging.INFO,
-            format="%(asctime)s - %(levelname)s - %(message)s",
-            handlers=[logging.handlers.RotatingFileHandler(
-                self.base_dir / "config_manager.log",
-                maxBytes=10*1024*1024,  # 10 MB
-                backupCount=5
-            )]
-        )
-        self.logger = logging.getLogger(__name__)
-
-    def _log(self, message: str, level: str, fb_id: str = "System", action: str = "Config") -> None:
-        """تسجيل الرسائل مع معالجة الأخطاء وتحديث الواجهة."""
-        try:
-            full_message = f"{message} | Trace: {traceback.format_stack()[-2]}"
-            self.log_manager.add_log(fb_id, None, action, level, full_message)
-            self.logger.log(getattr(logging, level.upper()), full_message)
-            self.statusUpdated.emit(f"{level}: {message}")
-        except Exception as e:
-            print(f"Error logging in ConfigManager: {str(e)}\n{traceback.format_exc()}")
-
-    def load_config(self) -> Dict[str, Any]:
-        """تحميل الإعدادات مع Lazy Loading ومعالجة الأخطاء."""
-        try:
-            # تحميل من environment variables للبيانات الحساسة
-            self.default_config["2captcha_api_key"] = os.getenv("2CAPTCHA_API_KEY", self.default_config["2captcha_api_key"])
-            self.default_config["app_id"] = os.getenv("APP_ID", self.default_config["app_id"])
-
-            if not self.config_file.exists():
-                self._log(f"No config file found at {self.config_file}, creating with defaults", "Warning")
-                config = self.default_config.copy()
-                self.save_config(config)
-                return config
-
-            with self.config_file.open("rb") as f:
-                loaded_config = orjson.loads(f.read())  # استخدام orjson للأداء
-            config = self.default_config.copy()
-            config.update({k: v for k, v in loaded_config.items() if k in config})
-            self.validate_config(config)
-            self._log(f"Config loaded successfully from {self.config_file}", "Info")
-            return config
-        except json.JSONDecodeError as e:
-            error_message = f"JSON decode error in {self.config_file}: {str(e)}\n{traceback.format_exc()}"
-            self._log(error_message, "Error")
-            return self.default_config.copy()
-        except FileNotFoundError:
-            self._log(f"Config file not found at {self.config_file}, using defaults", "Warning")
-            config = self.default_config.copy()
-            self.save_config(config)
-            return config
-        except Exception as e:
-            error_message = f"Unexpected error loading config: {str(e)}\n{traceback.format_exc()}"
-            self._log(error_message, "Error")
-            return self.default_config.copy()
-
-    def save_config(self, config: Optional[Dict[str, Any]] = None) -> None:
-        """حفظ الإعدادات مع نسخة احتياطية وأمان."""
-        with self.lock:
-            try:
-                config_to_save = config or self.config
-                self.validate_config(config_to_save)
-                config_to_save["last_modified"] = datetime.now().isoformat()
-
-                # تشفير البيانات الحساسة
-                if config_to_save["2captcha_api_key"]:
-                    config_to_save["2captcha_api_key"] = hashlib.sha256(
-                        config_to_save["2captcha_api_key"].encode()).hexdigest()
-
-                # نسخة احتياطية
-                if config_to_save.get("backup_config", True) and self.config_file.exists():
-                    self.backup_dir.mkdir(exist_ok=True)
-                    backup_file = self.backup_dir / f"config_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-                    shutil.copy2(self.config_file, backup_file)
-                    self._log(f"Created config backup: {backup_file}", "Info")
-                    self.cleanup_old_backups(max_backups=5)
-
-                # حفظ باستخدام orjson
-                start_time = datetime.now()
-                with self.config_file.open("wb") as f:
-                    f.write(orjson.dumps(config_to_save, option=orjson.OPT_INDENT_2))
-                duration = (datetime.now() - start_time).total_seconds()
-                self._log(f"Config saved successfully in {duration:.3f} seconds", "Info")
-                self.configUpdated.emit()
-            except PermissionError as e:
-                error_message = f"Permission denied saving config: {str(e)}\n{traceback.format_exc()}"
-                self._log(error_message, "Error")
-                raise
-            except Exception as e:
-                error_message = f"Error saving config: {str(e)}\n{traceback.format_exc()}"
-                self._log(error_message, "Error")
-                raise
-
-    def cleanup_old_backups(self, max_backups: int):
-        """تنظيف النسخ الاحتياطية القديمة."""
-        try:
-            backups = sorted(self.backup_dir.glob("config_*.json"), key=os.path.getmtime)
-            if len(backups) > max_backups:
-                for old_backup in backups[:-max_backups]:
-                    old_backup.unlink()
-                    self._log(f"Removed old backup: {old_backup}", "Info")
-        except Exception as e:
-            self._log(f"Error cleaning up backups: {str(e)}\n{traceback.format_exc()}", "Error")
-
-    def validate_config(self, config: Dict[str, Any]) -> None:
-        """التحقق من صحة الإعدادات."""
-        try:
-            for key, default_value in self.default_config.items():
-                value = config.get(key, default_value)
-                # الأعداد الصحيحة الموجبة
-                if key in ["default_delay", "post_delay", "auto_reply_interval"]:
-                    if not isinstance(value, int) or not (5 <= value <= 300):
-                        config[key] = default_value
-                        self._log(f"Invalid {key}: {value}, must be 5-300, reset to {default_value}", "Warning")
-                elif key in ["max_retries", "max_sessions"]:
-                    if not isinstance(value, int) or not (1 <= value <= 10):
-                        config[key] = default_value
-                        self._log(f"Invalid {key}: {value}, must be 1-10, reset to {default_value}", "Warning")
-                elif key == "max_group_members":
-                    if not isinstance(value, int) or not (100 <= value <= 1000000):
-                        config[key] = default_value
-                        self._log(f"Invalid {key}: {value}, must be 100-1000000, reset to {default_value}", "Warning")
-                elif key == "stop_after_posts":
-                    if not isinstance(value, int) or not (1 <= value <= 1000):
-                        config[key] = default_value
-                        self._log(f"Invalid {key}: {value}, must be 1-1000, reset to {default_value}", "Warning")
-                # القوائم
-                elif key in ["proxies", "custom_scripts"]:
-                    if not isinstance(value, list) or not all(isinstance(item, str) for item in value):
-                        config[key] = default_value
-                        self._log(f"Invalid {key}: {value}, must be list[str], reset to default", "Warning")
-                # القيم المنطقية
-                elif key in ["add_hashtags", "add_call_to_action", "use_access_token", "backup_config", 
-                             "predictive_ban_detection", "proxy_rotation_enabled", "auto_reply_enabled"]:
-                    if not isinstance(value, bool):
-                        config[key] = default_value
-                        self._log(f"Invalid {key}: {value}, must be bool, reset to {default_value}", "Warning")
-                # السلاسل النصية
-                elif key in ["2captcha_api_key", "default_language", "phone_number"]:
-                    if not isinstance(value, str):
-                        config[key] = default_value
-                        self._log(f"Invalid {key}: {value}, must be str, reset to {default_value}", "Warning")
-                elif key == "app_id":
-                    if not isinstance(value, str) or not value.isdigit():
-                        config[key] = default_value
-                        self._log(f"Invalid {key}: {value}, must be numeric str, reset to {default_value}", "Warning")
-                elif key in ["chrome_path", "chromedriver_path"]:
-                    if not isinstance(value, str) or (value and not Path(self.base_dir / value).exists()):
-                        self._log(f"Path for {key} invalid or not found: {value}, keeping but warning", "Warning")
-                elif key == "mobile_size":
-                    if not isinstance(value, str) or not re.match(r"^\d+x\d+$", value):
-                        config[key] = default_value
-                        self._log(f"Invalid {key}: {value}, must be WxH format, reset to {default_value}", "Warning")
-                    else:
-                        w, h = map(int, value.split("x"))
-                        if not (100 <= w <= 2000 and 100 <= h <= 2000):
-                            config[key] = default_value
-                            self._log(f"Invalid {key} dimensions: {value}, must be 100-2000, reset to {default_value}", "Warning")
-                elif key == "chrome_version":
-                    if not isinstance(value, str) or not value.isdigit():
-                        config[key] = default_value
-                        self._log(f"Invalid {key}: {value}, must be numeric str, reset to {default_value}", "Warning")
-        except Exception as e:
-            self._log(f"Validation error: {str(e)}\n{traceback.format_exc()}", "Error")
-
-    def get(self, key: str, default: Optional[Any] = None) -> Any:
-        """جلب قيمة إعداد."""
-        try:
-            return self.config.get(key, default if default is not None else self.default_config.get(key))
-        except Exception as e:
-            self._log(f"Error getting {key}: {str(e)}\n{traceback.format_exc()}", "Error")
-            return default if default is not None else self.default_config.get(key)
-
-    def set(self, key: str, value: Any) -> None:
-        """تحديث قيمة إعداد."""
-        try:
-            if key not in self.default_config:
-                self._log(f"Unknown config key: {key}, ignoring", "Warning")
-                return
-            self.config[key] = value
-            self.validate_config(self.config)
-            self.save_config()
-            self._log(f"Updated {key} to {value}", "Info")
-            self.configUpdated.emit()
-        except Exception as e:
-            self._log(f"Error setting {key}: {str(e)}\n{traceback.format_exc()}", "Error")
-            raise
-
-    def reset_to_default(self) -> None:
-        """إعادة تعيين الإعدادات إلى الافتراضي."""
-        try:
-            self.config = self.default_config.copy()
-            self.save_config()
-            self._log("Config reset to defaults", "Info")
-            self.statusUpdated.emit("Config reset to default settings")
-        except Exception as e:
-            self._log(f"Error resetting config: {str(e)}\n{traceback.format_exc()}", "Error")
-            raise
-
-if __name__ == "__main__":
-    from PyQt5.QtWidgets import QApplication
-    import sys
-    app = QApplication(sys.argv)
-    class DummyApp:
-        pass
-    class DummyLogManager:
-        def add_log(self, fb_id, target, action, level, message):
-            print(f"[{level}] {action}: {message}")
-    config = ConfigManager(DummyApp(), log_manager=DummyLogManager())
-    print("Loaded config:", config.config)
-    config.set("default_delay", 15)
-    config.set("proxies", ["http://proxy1:port"])
-    print("Updated config:", config.config)
-    config.reset_to_default()
+# config_manager.py
+import os
+import json
+import re
+import time
+import traceback
+import hashlib
+from datetime import datetime
+from typing import TYPE_CHECKING, Dict, Any, Optional
+import orjson  # لتحسين أداء JSON Parsing
+
+if TYPE_CHECKING:
+    from PyQt5.QtCore import QObject  # noqa: F401 — للتلميحات فقط، الاستيراد الفعلي مؤجل
+from pathlib import Path
+import logging
+import logging.handlers
+import shutil
+from threading import Lock  # لدعم multi-threading
+
+# بصمة hex بطول 64 = مفتاح سبق تمويهه، لا يُعاد حسابه
+_HEX64_RE = re.compile(r"[0-9a-f]{64}")
+
+
+def _int_range(lo: int, hi: int):
+    return lambda v: isinstance(v, int) and lo <= v <= hi
+
+
+def _is_str_list(v) -> bool:
+    return isinstance(v, list) and all(isinstance(item, str) for item in v)
+
+
+def _is_numeric_str(v) -> bool:
+    return isinstance(v, str) and v.isdigit()
+
+
+def _is_mobile_size(v) -> bool:
+    # partition + isdigit أرخص من regex لصيغة بسيطة مثل WxH
+    if not isinstance(v, str):
+        return False
+    w_str, sep, h_str = v.partition("x")
+    if not sep or not w_str.isdigit() or not h_str.isdigit():
+        return False
+    return 100 <= int(w_str) <= 2000 and 100 <= int(h_str) <= 2000
+
+
+_INT_5_300 = _int_range(5, 300)
+_INT_1_10 = _int_range(1, 10)
+_IS_BOOL = lambda v: isinstance(v, bool)
+_IS_STR = lambda v: isinstance(v, str)
+
+# key -> (دالة تحقق، وصف القيمة المتوقعة) — بحث O(1) بدل سلسلة if/elif طويلة
+_VALIDATORS = {
+    "default_delay": (_INT_5_300, "must be 5-300"),
+    "post_delay": (_INT_5_300, "must be 5-300"),
+    "auto_reply_interval": (_INT_5_300, "must be 5-300"),
+    "max_retries": (_INT_1_10, "must be 1-10"),
+    "max_sessions": (_INT_1_10, "must be 1-10"),
+    "max_group_members": (_int_range(100, 1000000), "must be 100-1000000"),
+    "stop_after_posts": (_int_range(1, 1000), "must be 1-1000"),
+    "proxies": (_is_str_list, "must be list[str]"),
+    "custom_scripts": (_is_str_list, "must be list[str]"),
+    "add_hashtags": (_IS_BOOL, "must be bool"),
+    "add_call_to_action": (_IS_BOOL, "must be bool"),
+    "use_access_token": (_IS_BOOL, "must be bool"),
+    "backup_config": (_IS_BOOL, "must be bool"),
+    "predictive_ban_detection": (_IS_BOOL, "must be bool"),
+    "proxy_rotation_enabled": (_IS_BOOL, "must be bool"),
+    "auto_reply_enabled": (_IS_BOOL, "must be bool"),
+    "2captcha_api_key": (_IS_STR, "must be str"),
+    "default_language": (_IS_STR, "must be str"),
+    "phone_number": (_IS_STR, "must be str"),
+    "app_id": (_is_numeric_str, "must be numeric str"),
+    "chrome_version": (_is_numeric_str, "must be numeric str"),
+    "mobile_size": (_is_mobile_size, "must be WxH format, 100-2000"),
+}
+
+
+class ConfigCore:
+    """
+    كلاس لإدارة إعدادات التطبيق باستخدام ملف JSON — نسخة خالية من Qt.
+    يدعم تحميل، حفظ، وتحديث الإعدادات مع التحقق من الصحة والنسخ الاحتياطي،
+    ويصلح للاستخدام بدون واجهة (CI، سكربتات). غلاف ConfigManager أدناه يضيف إشارات Qt.
+    """
+
+    def __init__(self, app, config_file: str = "config.json", log_manager=None):
+        """
+        تهيئة ConfigCore مع التكامل مع التطبيق الرئيسي.
+
+        Args:
+            app: كائن SmartPosterApp للوصول إلى وظائف التطبيق.
+            config_file (str): مسار ملف الإعدادات (افتراضي: config.json).
+            log_manager: كائن LogManager لتسجيل الأحداث.
+        """
+        self.app = app
+        self.base_dir = Path(os.path.dirname(os.path.abspath(__file__)))
+        self.config_file = self.base_dir / config_file
+        self.backup_dir = self.base_dir / "backups"
+        self.log_manager = log_manager
+        self.lock = Lock()  # لضمان عمليات كتابة آمنة في بيئة multi-threaded
+        self._last_validated_digest: Optional[bytes] = None  # لتخطي إعادة التحقق عند عدم التغيير
+        self._last_saved_bytes: Optional[bytes] = None  # آخر محتوى محفوظ لتخطي الكتابات عديمة الأثر
+
+        if not self.log_manager:
+            raise ValueError("LogManager is required for ConfigManager")
+
+        # الإعدادات الافتراضية مع تحسينات
+        self.default_config: Dict[str, Any] = {
+            "2captcha_api_key": "",                  # مفتاح API مشفر
+            "default_delay": 5,                      # تأخير افتراضي (5-60 ثانية)
+            "max_retries": 3,                        # أقصى محاولات (1-10)
+            "proxies": [],                           # قائمة وكلاء
+            "custom_scripts": [
+                "Thanks for your comment! Contact us at 01225398839",
+                "For more info, call 01225398839",
+                "Great post! Reach out for details."
+            ],
+            "max_sessions": 5,                       # أقصى جلسات (1-10)
+            "add_hashtags": True,
+            "add_call_to_action": True,
+            "default_language": "en",
+            "max_group_members": 10000,              # أقصى أعضاء (100-1000000)
+            "use_access_token": False,
+            "app_id": "123456789012345",             # معرف تطبيق فيسبوك
+            "backup_config": True,
+            "chrome_path": "drivers/chrome.exe",
+            "chromedriver_path": "drivers/chromedriver.exe",
+            "mobile_size": "360x640",
+            "chrome_version": "133",
+            "post_delay": 10,                        # تأخير النشر (5-300 ثانية)
+            "stop_after_posts": 10,                  # إيقاف بعد (1-1000)
+            "predictive_ban_detection": True,
+            "proxy_rotation_enabled": True,
+            "auto_reply_enabled": True,
+            "auto_reply_interval": 120,              # فاصل رد (5-300 ثانية)
+            "phone_number": "01225398839",
+            "last_modified": None                    # تتبع آخر تعديل
+        }
+
+        # مجموعة المفاتيح المسموحة ثابتة بعد البناء
+        self._allowed_keys = frozenset(self.default_config)
+
+        # إعداد التسجيل مع log rotation
+        self.setup_logging()
+
+        try:
+            self.config = self.load_config()
+            self._log("ConfigManager initialized successfully", "Info")
+        except Exception as e:
+            if self.logger.isEnabledFor(logging.ERROR):
+                self._log(f"Failed to initialize ConfigManager: {str(e)}\n{traceback.format_exc()}", "Error")
+            self.config = self.default_config.copy()
+            self.save_config()
+
+    def _emit_config_updated(self) -> None:
+        """نقطة ربط لإشارة تحديث الإعدادات؛ لا تفعل شيئًا بدون واجهة."""
+
+    def _emit_status(self, text: str) -> None:
+        """نقطة ربط لإشارة الحالة؛ لا تفعل شيئًا بدون واجهة."""
+
+    def setup_logging(self):
+        """إعداد التسجيل مع log rotation."""
+        logging.basicConfig(
+            filename=self.base_dir / "config_manager.log",
+            level=logging.INFO,
+            format="%(asctime)s - %(levelname)s - %(message)s",
+            handlers=[logging.handlers.RotatingFileHandler(
+                self.base_dir / "config_manager.log",
+                maxBytes=10*1024*1024,  # 10 MB
+                backupCount=5
+            )]
+        )
+        self.logger = logging.getLogger(__name__)
+
+    def _log(self, message: str, level: str, fb_id: str = "System", action: str = "Config") -> None:
+        """تسجيل الرسائل مع معالجة الأخطاء وتحديث الواجهة."""
+        try:
+            # تنسيق الـ stack مكلف، يُبنى فقط للمستويات المهمة
+            if level in ("Error", "Warning"):
+                full_message = f"{message} | Trace: {traceback.format_stack(limit=2)[0]}"
+            else:
+                full_message = message
+            self.log_manager.add_log(fb_id, None, action, level, full_message)
+            self.logger.log(getattr(logging, level.upper()), full_message)
+            self._emit_status(f"{level}: {message}")
+        except Exception as e:
+            print(f"Error logging in ConfigManager: {str(e)}\n{traceback.format_exc()}")
+
+    def load_config(self) -> Dict[str, Any]:
+        """تحميل الإعدادات مع Lazy Loading ومعالجة الأخطاء."""
+        try:
+            # تحميل من environment variables للبيانات الحساسة
+            self.default_config["2captcha_api_key"] = os.getenv("2CAPTCHA_API_KEY", self.default_config["2captcha_api_key"])
+            self.default_config["app_id"] = os.getenv("APP_ID", self.default_config["app_id"])
+
+            if not self.config_file.exists():
+                self._log(f"No config file found at {self.config_file}, creating with defaults", "Warning")
+                config = self.default_config.copy()
+                self.save_config(config)
+                return config
+
+            # قراءة عبر الـ fd مباشرة: syscall واحد وتخصيص واحد بدل طبقات io المؤقتة،
+            # و orjson يفضل bytes متصلة واحدة
+            fd = os.open(str(self.config_file), os.O_RDONLY)
+            try:
+                data = os.read(fd, os.fstat(fd).st_size)
+            finally:
+                os.close(fd)
+            loaded_config = orjson.loads(data)  # استخدام orjson للأداء
+            config = self.default_config.copy()
+            # تقاطع المفاتيح يتم في C دون dict وسيط أو فحص `in` لكل مفتاح
+            config.update((k, loaded_config[k]) for k in self._allowed_keys & loaded_config.keys())
+            self.validate_config(config)
+            self._log(f"Config loaded successfully from {self.config_file}", "Info")
+            return config
+        except json.JSONDecodeError as e:
+            if self.logger.isEnabledFor(logging.ERROR):
+                self._log(f"JSON decode error in {self.config_file}: {str(e)}\n{traceback.format_exc()}", "Error")
+            return self.default_config.copy()
+        except FileNotFoundError:
+            self._log(f"Config file not found at {self.config_file}, using defaults", "Warning")
+            config = self.default_config.copy()
+            self.save_config(config)
+            return config
+        except Exception as e:
+            if self.logger.isEnabledFor(logging.ERROR):
+                self._log(f"Unexpected error loading config: {str(e)}\n{traceback.format_exc()}", "Error")
+            return self.default_config.copy()
+
+    def save_config(self, config: Optional[Dict[str, Any]] = None, pretty: bool = False) -> None:
+        """حفظ الإعدادات مع نسخة احتياطية وأمان. pretty=True لملفات التصدير المقروءة فقط.
+
+        التحقق والتسلسل والنسخ الاحتياطي تجري خارج القفل؛ القفل يغطي فقط
+        rename الذرّي وتبديل مرجع self.config، فيبقى زمن الاحتجاز نانوثوانٍ.
+        """
+        try:
+            config_to_save = config if config is not None else self.config
+            self.validate_config(config_to_save)
+            config_to_save["last_modified"] = datetime.now().isoformat()
+
+            # تمويه البيانات الحساسة — blake2b أسرع من sha256 على المدخلات القصيرة،
+            # والمفتاح الممّوه سابقًا (64 hex) لا يُعاد حسابه (كان يُعاد تمويه البصمة نفسها كل حفظ)
+            api_key = config_to_save["2captcha_api_key"]
+            if api_key and not _HEX64_RE.fullmatch(api_key):
+                config_to_save["2captcha_api_key"] = hashlib.blake2b(
+                    api_key.encode(), digest_size=32).hexdigest()
+
+            # حفظ بلا تغيير فعلي (last_modified مستثنى) = لا كتابة ولا نسخة احتياطية
+            compare_payload = orjson.dumps(
+                {k: v for k, v in config_to_save.items() if k != "last_modified"})
+            if compare_payload == self._last_saved_bytes:
+                return
+
+            # نسخة احتياطية
+            if config_to_save.get("backup_config", True) and self.config_file.exists():
+                self.backup_dir.mkdir(exist_ok=True)
+                backup_file = self.backup_dir / f"config_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+                shutil.copy2(self.config_file, backup_file)
+                self._log(f"Created config backup: {backup_file}", "Info")
+                self.cleanup_old_backups(max_backups=5)
+
+            # حفظ باستخدام orjson — مضغوط افتراضيًا (نصف الحجم)، وكتابة ذرّية
+            # عبر ملف مؤقت ثم rename بدل truncate ثم write
+            t0 = time.monotonic_ns()
+            payload = orjson.dumps(config_to_save, option=orjson.OPT_INDENT_2) if pretty else orjson.dumps(config_to_save)
+            tmp_file = self.config_file.with_suffix(".tmp")
+            tmp_file.write_bytes(payload)
+            with self.lock:
+                os.replace(tmp_file, self.config_file)
+                # إسناد dict ذرّي تحت الـ GIL: القراء يرون النسخة القديمة أو الجديدة كاملة
+                self.config = config_to_save
+                self._last_saved_bytes = compare_payload
+            if self.logger.isEnabledFor(logging.INFO):
+                duration_ms = (time.monotonic_ns() - t0) / 1e6
+                self._log(f"Config saved successfully in {duration_ms:.3f}ms", "Info")
+            self._emit_config_updated()
+        except PermissionError as e:
+            if self.logger.isEnabledFor(logging.ERROR):
+                self._log(f"Permission denied saving config: {str(e)}\n{traceback.format_exc()}", "Error")
+            raise
+        except Exception as e:
+            if self.logger.isEnabledFor(logging.ERROR):
+                self._log(f"Error saving config: {str(e)}\n{traceback.format_exc()}", "Error")
+            raise
+
+    def cleanup_old_backups(self, max_backups: int):
+        """تنظيف النسخ الاحتياطية القديمة."""
+        try:
+            # scandir مع stat المخزن في DirEntry بدل glob + getmtime (stat إضافي لكل ملف)
+            with os.scandir(self.backup_dir) as entries:
+                backups = sorted(
+                    (e for e in entries if e.is_file() and e.name.startswith("config_") and e.name.endswith(".json")),
+                    key=lambda e: e.stat().st_mtime)
+            if len(backups) > max_backups:
+                for old_backup in backups[:-max_backups]:
+                    os.unlink(old_backup.path)
+                    self._log(f"Removed old backup: {old_backup.path}", "Info")
+        except Exception as e:
+            if self.logger.isEnabledFor(logging.ERROR):
+                self._log(f"Error cleaning up backups: {str(e)}\n{traceback.format_exc()}", "Error")
+
+    def _config_digest(self, config: Dict[str, Any]) -> Optional[bytes]:
+        """بصمة سريعة للإعدادات لاكتشاف التغييرات (last_modified مستثنى)."""
+        try:
+            payload = orjson.dumps(
+                {k: v for k, v in config.items() if k != "last_modified"},
+                option=orjson.OPT_SORT_KEYS, default=str)
+            return hashlib.blake2b(payload, digest_size=16).digest()
+        except Exception:
+            return None
+
+    def validate_config(self, config: Dict[str, Any]) -> None:
+        """التحقق من صحة الإعدادات. يتم تخطي التحقق إذا لم تتغير الإعدادات منذ آخر مرة."""
+        digest = self._config_digest(config)
+        if digest is not None and digest == self._last_validated_digest:
+            return
+        try:
+            for key, (check, expected) in _VALIDATORS.items():
+                default_value = self.default_config[key]
+                value = config.get(key, default_value)
+                if not check(value):
+                    config[key] = default_value
+                    self._log(f"Invalid {key}: {value}, {expected}, reset to {default_value}", "Warning")
+            # المسارات لا يُعاد تعيينها، فقط تحذير
+            for key in ("chrome_path", "chromedriver_path"):
+                value = config.get(key, self.default_config[key])
+                if not isinstance(value, str) or (value and not Path(self.base_dir / value).exists()):
+                    self._log(f"Path for {key} invalid or not found: {value}, keeping but warning", "Warning")
+            # إعادة حساب البصمة بعد أي تصحيحات أعلاه
+            self._last_validated_digest = self._config_digest(config)
+        except Exception as e:
+            if self.logger.isEnabledFor(logging.ERROR):
+                self._log(f"Validation error: {str(e)}\n{traceback.format_exc()}", "Error")
+
+    def get(self, key: str, default: Optional[Any] = None) -> Any:
+        """جلب قيمة إعداد."""
+        try:
+            return self.config.get(key, default if default is not None else self.default_config.get(key))
+        except Exception as e:
+            if self.logger.isEnabledFor(logging.ERROR):
+                self._log(f"Error getting {key}: {str(e)}\n{traceback.format_exc()}", "Error")
+            return default if default is not None else self.default_config.get(key)
+
+    def set(self, key: str, value: Any) -> None:
+        """تحديث قيمة إعداد."""
+        try:
+            if key not in self.default_config:
+                self._log(f"Unknown config key: {key}, ignoring", "Warning")
+                return
+            # copy-on-write: يُبنى dict جديد ويُبدَّل داخل save_config بدل التعديل في المكان
+            new_config = {**self.config, key: value}
+            self.validate_config(new_config)
+            self.save_config(new_config)
+            self._log(f"Updated {key} to {value}", "Info")
+            self._emit_config_updated()
+        except Exception as e:
+            if self.logger.isEnabledFor(logging.ERROR):
+                self._log(f"Error setting {key}: {str(e)}\n{traceback.format_exc()}", "Error")
+            raise
+
+    def reset_to_default(self) -> None:
+        """إعادة تعيين الإعدادات إلى الافتراضي."""
+        try:
+            self.config = self.default_config.copy()
+            self.save_config()
+            self._log("Config reset to defaults", "Info")
+            self._emit_status("Config reset to default settings")
+        except Exception as e:
+            if self.logger.isEnabledFor(logging.ERROR):
+                self._log(f"Error resetting config: {str(e)}\n{traceback.format_exc()}", "Error")
+            raise
+
+def _build_qt_manager():
+    """بناء غلاف Qt عند أول طلب فقط — استيراد PyQt5 مؤجل عن وقت استيراد الوحدة."""
+    from PyQt5.QtCore import pyqtSignal, QObject
+
+    class ConfigManager(ConfigCore, QObject):
+        """غلاف ConfigCore مع إشارات Qt للتكامل مع الواجهة."""
+        configUpdated = pyqtSignal()  # إشارة لإعلام المكونات بتحديث الإعدادات
+        statusUpdated = pyqtSignal(str)  # إشارة لتحديث حالة الواجهة
+
+        def __init__(self, app, config_file: str = "config.json", log_manager=None):
+            QObject.__init__(self)
+            ConfigCore.__init__(self, app, config_file, log_manager)
+
+        def _emit_config_updated(self) -> None:
+            self.configUpdated.emit()
+
+        def _emit_status(self, text: str) -> None:
+            self.statusUpdated.emit(text)
+
+    return ConfigManager
+
+
+def __getattr__(name):
+    # PEP 562: يبقي `from ConfigManager import ConfigManager` يعمل دون تحميل Qt
+    # إلا عند الوصول الفعلي للكلاس
+    if name == "ConfigManager":
+        manager = _build_qt_manager()
+        globals()["ConfigManager"] = manager
+        return manager
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+if __name__ == "__main__":
+    from PyQt5.QtWidgets import QApplication
+    import sys
+    app = QApplication(sys.argv)
+    class DummyApp:
+        pass
+    class DummyLogManager:
+        def add_log(self, fb_id, target, action, level, message):
+            print(f"[{level}] {action}: {message}")
+    config = _build_qt_manager()(DummyApp(), log_manager=DummyLogManager())
+    print("Loaded config:", config.config)
+    config.set("default_delay", 15)
+    config.set("proxies", ["http://proxy1:port"])
+    print("Updated config:", config.config)
+    config.reset_to_default()
     print("Reset config:", config.config)
\ No newline at end of file
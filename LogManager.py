@@ -1,25 +1,25 @@
+import hashlib
 import os
+import queue
+from collections import Counter
+import re
 import shutil
-from datetime import datetime, timedelta
+import threading
+import time
+from datetime import date, datetime, timedelta
 from typing import Optional, List, Dict, Any
 from PyQt5.QtWidgets import QTableWidget, QTableWidgetItem, QPushButton, QMessageBox, QHBoxLayout, QApplication
-from PyQt5.QtCore import pyqtSignal, QObject, Qt, QMetaObject, Q_ARG, QThreadPool, QRunnable
-from PyQt5.QtCore import QCryptographicHash
+from PyQt5.QtCore import pyqtSignal, QObject, Qt, QMetaObject, Q_ARG
+import orjson  # سطور NDJSON تُبنى في C مباشرة دون تنسيق نصي
 import traceback
 import logging
 from logging.handlers import RotatingFileHandler
 
-class LogUpdateWorker(QRunnable):
-    """Worker لتحديث السجلات في خلفية باستخدام QThreadPool."""
-    def __init__(self, log_manager, table, fb_id, action):
-        super().__init__()
-        self.log_manager = log_manager
-        self.table = table
-        self.fb_id = fb_id
-        self.action = action
+# الرسائل الحساسة تُخزن كبصمة فقط؛ البحث ببديل مجمّع بدل نسخ .lower() لكل رسالة
+_SENSITIVE_RE = re.compile("password|token|secret|api_key", re.IGNORECASE)
 
-    def run(self):
-        self.log_manager.update_logs_table(self.table, self.fb_id, self.action)
+# عمود status في جدول logs يقبل Success/Failed/Warning فقط؛ المستويات تُحوَّل قبل الإدراج
+_LEVEL_STATUS = {"info": "Success", "warning": "Warning"}
 
 class LogManager(QObject):
     logsUpdated = pyqtSignal()
@@ -34,8 +34,19 @@ class LogManager(QObject):
             self.logs_dir = os.path.join(self.base_dir, "logs")
             os.makedirs(self.logs_dir, exist_ok=True)
             self.last_log_id = 0
-            self.thread_pool = QThreadPool()  # لتحسين الأداء مع المهام المتعددة
-            self.thread_pool.setMaxThreadCount(4)  # تحديد عدد الخيوط
+            # خيط واحد دائم لطلبات تحديث الجدول؛ الدفعات المتتالية تُدمج في طلب واحد
+            self._refresh_queue = queue.SimpleQueue()
+            self._refresh_thread = threading.Thread(target=self._refresh_loop, daemon=True)
+            self._refresh_thread.start()
+            # مسار ملف اليوم وحجمه مخزنان لتجنب stat syscalls لكل دفعة
+            self._cached_day = None
+            self._cached_log_path = None
+            self._cached_size = 0
+            self._last_disk_check = 0.0  # آخر فحص statvfs؛ يعاد كل 60 ثانية فقط
+            # طابور داخلي مع خيط تفريغ واحد لتجميع الكتابات بدل كتابة لكل سجل
+            self._log_queue = queue.SimpleQueue()
+            self._flush_thread = threading.Thread(target=self._flush_loop, daemon=True)
+            self._flush_thread.start()
             # إعداد log rotation
             self.logger = logging.getLogger("LogManager")
             handler = RotatingFileHandler(
@@ -52,20 +63,12 @@ class LogManager(QObject):
             self._log(error_message, "Error")
             raise
 
-    def _sanitize_input(self, value: Any) -> str:
-        """تنظيف المدخلات لمنع SQL Injection."""
-        if value is None:
-            return ""
-        return str(value).replace("'", "''").replace(";", "").strip()
-
     def _log(self, message: str, level: str, fb_id: str = "System", action: str = "LogManager") -> None:
         try:
-            sanitized_message = self._sanitize_input(message)
-            sanitized_fb_id = self._sanitize_input(fb_id)
-            sanitized_action = self._sanitize_input(action)
-            self.db.add_log(sanitized_fb_id, None, sanitized_action, level, sanitized_message)
-            self.logger.log(getattr(logging, level.upper()), f"{sanitized_fb_id} - {sanitized_action}: {sanitized_message}")
-            self.statusUpdated.emit(f"{level}: {sanitized_message}")
+            # قاعدة البيانات تستخدم placeholders، لا حاجة لتنظيف نصي هنا
+            self.db.add_log(fb_id, None, action, level, message)
+            self.logger.log(getattr(logging, level.upper()), f"{fb_id} - {action}: {message}")
+            self.statusUpdated.emit(f"{level}: {message}")
         except Exception as e:
             error_message = f"Error logging internally: {str(e)}\n{traceback.format_exc()}"
             with open(os.path.join(self.logs_dir, "fallback.log"), "a", encoding="utf-8") as f:
@@ -74,41 +77,99 @@ class LogManager(QObject):
 
     def add_log(self, fb_id: str, target: Optional[str], action: str, level: str, message: str) -> None:
         try:
-            sanitized_fb_id = self._sanitize_input(fb_id)
-            sanitized_target = self._sanitize_input(target)
-            sanitized_action = self._sanitize_input(action)
-            sanitized_message = self._sanitize_input(message)
-            # تشفير الرسالة لو كانت حساسة
-            hashed_message = QCryptographicHash.hash(sanitized_message.encode(), QCryptographicHash.Sha256).hex() if "password" in sanitized_message.lower() else sanitized_message
-            self.db.add_log(sanitized_fb_id, sanitized_target, sanitized_action, level, hashed_message)
-            log_file = os.path.join(self.logs_dir, f"{datetime.now().strftime('%Y-%m-%d')}.log")
-            if os.path.isfile(log_file) and os.path.getsize(log_file) > 5*1024*1024:  # 5 MB حد
-                self._log("Log file size exceeds limit, rotating...", "Warning")
-                os.rename(log_file, f"{log_file}.old")
-            # التحقق من مساحة التخزين
-            usage = shutil.disk_usage(self.logs_dir)
-            if usage.free < 1024*1024:  # أقل من 1 MB متاح
-                self._log("Low disk space detected", "Warning")
-                raise RuntimeError("Insufficient disk space")
-            with open(log_file, "a", encoding="utf-8") as f:
-                f.write(f"[{datetime.now()}] {level} - {sanitized_fb_id} - {sanitized_action}: {hashed_message}\n")
+            message = "" if message is None else str(message).strip()
+            # تشفير الرسالة لو كانت حساسة — hashlib يستفيد من تسريع OpenSSL للـ SHA-256
+            hashed_message = hashlib.sha256(message.encode()).hexdigest() if _SENSITIVE_RE.search(message) else message
+            # الدفع للطابور فقط؛ خيط التفريغ يتكفل بالملف وقاعدة البيانات دفعةً واحدة
+            self._log_queue.put((datetime.now(), fb_id, target, action, level, hashed_message))
             self.logsUpdated.emit()
             self.statusUpdated.emit(f"{level}: {hashed_message}")
-            self._log(f"Added log: {hashed_message}", "Info", sanitized_fb_id, sanitized_action)
         except Exception as e:
             error_message = f"Error adding log: {str(e)}\n{traceback.format_exc()}"
             self._log(error_message, "Error", fb_id, action)
             raise
 
+    def _refresh_loop(self) -> None:
+        """استهلاك طلبات تحديث الجدول مع دمج الطلبات المتراكمة في آخر طلب فقط."""
+        while True:
+            request = self._refresh_queue.get()
+            try:
+                while True:
+                    request = self._refresh_queue.get_nowait()
+            except queue.Empty:
+                pass
+            table, fb_id, action = request
+            try:
+                self.update_logs_table(table, fb_id, action)
+            except Exception as e:
+                self._log(f"Error in refresh worker: {str(e)}\n{traceback.format_exc()}", "Error")
+
+    def request_logs_refresh(self, table: QTableWidget, fb_id: Optional[str] = None, action: Optional[str] = None) -> None:
+        """جدولة تحديث للجدول على خيط التحديث الدائم."""
+        self._refresh_queue.put((table, fb_id, action))
+
+    def _flush_loop(self) -> None:
+        """تفريغ الطابور على دفعات حتى 256 سجلًا لتقليل syscalls وعمليات commit."""
+        while True:
+            items = [self._log_queue.get()]
+            while len(items) < 256:
+                try:
+                    items.append(self._log_queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._flush_batch(items)
+            except Exception as e:
+                error_message = f"Error flushing log batch: {str(e)}\n{traceback.format_exc()}"
+                with open(os.path.join(self.logs_dir, "fallback.log"), "a", encoding="utf-8") as f:
+                    f.write(f"[{datetime.now()}] {error_message}\n")
+
+    def _current_log_path(self) -> str:
+        """مسار ملف سجل اليوم، يُعاد حسابه فقط عند تغيّر اليوم."""
+        today = date.today()
+        if today != self._cached_day:
+            self._cached_day = today
+            self._cached_log_path = os.path.join(self.logs_dir, f"{today}.log")
+            self._cached_size = os.path.getsize(self._cached_log_path) if os.path.isfile(self._cached_log_path) else 0
+        return self._cached_log_path
+
+    def _flush_batch(self, items: list) -> None:
+        log_file = self._current_log_path()
+        if self._cached_size > 5*1024*1024:  # 5 MB حد
+            os.rename(log_file, f"{log_file}.old")
+            self._cached_size = 0
+        # التحقق من مساحة التخزين كل 60 ثانية كحد أقصى بدل statvfs لكل دفعة
+        now = time.monotonic()
+        if now - self._last_disk_check >= 60.0:
+            self._last_disk_check = now
+            usage = shutil.disk_usage(self.logs_dir)
+            if usage.free < 1024*1024:  # أقل من 1 MB متاح
+                raise RuntimeError("Insufficient disk space")
+        # NDJSON: orjson يسلسل datetime مباشرة ويعيد bytes جاهزة للكتابة؛ الملف اليومي يُكتب
+        # قبل قاعدة البيانات حتى لا يضيع سجلّه إذا فشل الإدراج
+        payload = b"".join(
+            orjson.dumps(
+                {"ts": ts, "lvl": level, "fb": fb_id, "act": action, "msg": message},
+                option=orjson.OPT_APPEND_NEWLINE)
+            for ts, fb_id, target, action, level, message in items)
+        with open(log_file, "ab") as f:
+            f.write(payload)
+        # تحديث الحجم محليًا بدل إعادة stat بعد كل كتابة
+        self._cached_size += len(payload)
+        # دفعة واحدة إلى قاعدة البيانات: معاملة واحدة بدل رحلة طابور لكل سجل، والمستوى
+        # يُحوَّل إلى قيمة status المسموحة وإلا أسقط صف واحد مخالف الدفعة كلها
+        self.db.add_logs_bulk(
+            [(fb_id or "", target or "", action,
+              _LEVEL_STATUS.get(level.lower(), "Failed"), message or "")
+             for ts, fb_id, target, action, level, message in items])
+
     def update_logs_table(self, table: QTableWidget, fb_id: Optional[str] = None, action: Optional[str] = None, offset: int = 0, limit: int = 100) -> None:
         try:
             table.setSortingEnabled(False)  # تعطيل الفرز لتحسين الأداء
-            sanitized_fb_id = self._sanitize_input(fb_id)
-            sanitized_action = self._sanitize_input(action)
             if not hasattr(self, 'last_log_id') or self.last_log_id == 0:
                 logs = []
                 try:
-                    logs = self.db.get_logs(limit=limit, offset=offset, fb_id=sanitized_fb_id, action=sanitized_action)
+                    logs = self.db.get_logs(limit=limit, offset=offset, fb_id=fb_id, action=action)
                 except Exception as e:
                     self._log(f"Error fetching logs: {str(e)}\n{traceback.format_exc()}", "Error")
                     if QApplication.instance():
@@ -126,18 +187,27 @@ class LogManager(QObject):
                     return
 
             current_rows = table.rowCount()
-            table.setRowCount(current_rows + len(logs))
-            if logs:
-                table.setColumnCount(len(logs[0]))  # ديناميكي بناءً على البيانات
-            else:
-                table.setColumnCount(7)
-            table.setHorizontalHeaderLabels(["ID", "Account ID", "Target", "Action", "Timestamp", "Status", "Details"])
-            table.setStyleSheet("...")
-            for i, log in enumerate(logs):
-                row = current_rows + i
-                for col, value in enumerate(log):
-                    table.setItem(row, col, QTableWidgetItem(str(value or "")))
-            table.resizeColumnsToContents()
+            # تعليق إعادة الرسم والإشارات أثناء التعبئة: تحديث واحد بدل إشعار لكل خلية
+            table.setUpdatesEnabled(False)
+            table.blockSignals(True)
+            try:
+                table.setRowCount(current_rows + len(logs))
+                if logs:
+                    table.setColumnCount(len(logs[0]))  # ديناميكي بناءً على البيانات
+                else:
+                    table.setColumnCount(7)
+                table.setHorizontalHeaderLabels(["ID", "Account ID", "Target", "Action", "Timestamp", "Status", "Details"])
+                table.setStyleSheet("...")
+                for i, log in enumerate(logs):
+                    row = current_rows + i
+                    for col, value in enumerate(log):
+                        table.setItem(row, col, QTableWidgetItem(str(value or "")))
+                # resizeColumnsToContents تكلفتها rows×cols؛ تكفي مرة عند أول تعبئة
+                if current_rows == 0:
+                    table.resizeColumnsToContents()
+            finally:
+                table.blockSignals(False)
+                table.setUpdatesEnabled(True)
             if logs and all(isinstance(log[0], (int, str)) for log in logs):
                 self.last_log_id = max(int(log[0]) for log in logs)
             table.setSortingEnabled(True)  # إعادة تفعيل الفرز
@@ -182,7 +252,7 @@ class LogManager(QObject):
         try:
             refresh_button = QPushButton("Refresh Logs")
             refresh_button.setStyleSheet("...")
-            refresh_button.clicked.connect(lambda: self.thread_pool.start(LogUpdateWorker(self, table, None, None)))
+            refresh_button.clicked.connect(lambda: self.request_logs_refresh(table))
             layout.addWidget(refresh_button)
             self._log("Refresh button added to logs", "Info")
         except Exception as e:
@@ -193,12 +263,19 @@ class LogManager(QObject):
     def get_log_summary(self) -> Dict[str, Any]:
         try:
             logs = self.db.get_logs(limit=1000)
+            # تمريرة واحدة بدل أربع تمريرات وقوائم وسيطة
+            counts = Counter()
+            last_log_time = ""
+            for log in logs:
+                counts[log[5]] += 1
+                if log[4] and log[4] > last_log_time:
+                    last_log_time = log[4]
             summary = {
                 "total_logs": len(logs),
-                "success_count": len([log for log in logs if log[5] == "Success"]),
-                "error_count": len([log for log in logs if log[5] == "Error"]),
-                "warning_count": len([log for log in logs if log[5] == "Warning"]),
-                "last_log_time": max((log[4] for log in logs), default="N/A") if logs else "N/A"
+                "success_count": counts.get("Success", 0),
+                "error_count": counts.get("Error", 0),
+                "warning_count": counts.get("Warning", 0),
+                "last_log_time": last_log_time or "N/A"
             }
             self._log(f"Generated log summary: {summary}", "Info")
             return summary
@@ -210,12 +287,13 @@ class LogManager(QObject):
     def cleanup_old_logs(self, days: int = 30) -> None:
         """حذف السجلات القديمة تلقائيًا."""
         try:
-            cutoff = datetime.now() - timedelta(days=days)
-            for log_file in os.listdir(self.logs_dir):
-                file_path = os.path.join(self.logs_dir, log_file)
-                if os.path.isfile(file_path) and datetime.fromtimestamp(os.path.getmtime(file_path)) < cutoff:
-                    os.remove(file_path)
-                    self._log(f"Deleted old log file: {log_file}", "Info")
+            # scandir يعيد is_file/stat من قراءة المجلد نفسها، والمقارنة على timestamp رقمي
+            cutoff_ts = (datetime.now() - timedelta(days=days)).timestamp()
+            with os.scandir(self.logs_dir) as entries:
+                for entry in entries:
+                    if entry.is_file() and entry.stat().st_mtime < cutoff_ts:
+                        os.unlink(entry.path)
+                        self._log(f"Deleted old log file: {entry.name}", "Info")
             self.db.cleanup_old_logs(days)  # يفترض أن Database لديه هذه الوظيفة
             self._log(f"Cleaned up logs older than {days} days", "Info")
         except Exception as e:
@@ -1,738 +1,1062 @@
-import sqlite3
-import os
-import hashlib
-import traceback
-from datetime import datetime, timedelta
-from PyQt5.QtCore import pyqtSignal, QObject
-from pathlib import Path
-import shutil
-import logging
-import logging.handlers
-from threading import Lock
-
-class Database(QObject):
-    dbUpdated = pyqtSignal()
-    statusUpdated = pyqtSignal(str)
-
-    def __init__(self, app, db_file="smart_poster.db", log_manager=None):
-        super().__init__()
-        self.app = app
-        self.base_dir = Path(os.path.dirname(os.path.abspath(__file__)))
-        self.db_file = self.base_dir / db_file
-        self.backup_dir = self.base_dir / "backups"
-        self.log_manager = log_manager
-        self.lock = Lock()
-        self.conn = None
-        self.cursor = None
-        self.last_log_id = 0
-
-        if not self.log_manager:
-            raise ValueError("LogManager is required for Database")
-
-        self.setup_logging()
-        self.connect()
-        self.optimize_settings()
-        self.create_tables()
-        self.create_indexes()
-        self.create_auto_backup()
-
-    def setup_logging(self):
-        logging.basicConfig(
-            filename=self.base_dir / "database.log",
-            level=logging.INFO,
-            format="%(asctime)s - %(levelname)s - %(message)s",
-            handlers=[logging.handlers.RotatingFileHandler(
-                self.base_dir / "database.log",
-                maxBytes=10*1024*1024,
-                backupCount=5
-            )]
-        )
-        self.logger = logging.getLogger(__name__)
-
-    def _log(self, message, level, fb_id="System", action="Database"):
-        try:
-            timestamp = datetime.now().isoformat()
-            full_message = f"{timestamp} | {message} | Trace: {traceback.format_stack()[-2]}"
-            if self.log_manager:
-                self.log_manager.add_log(fb_id, None, action, level, full_message)
-            self.logger.log(getattr(logging, level.upper()), full_message)
-            self.statusUpdated.emit(f"{level}: {message}")
-        except Exception as e:
-            print(f"Error logging in Database: {str(e)}\n{traceback.format_exc()}")
-
-    def connect(self):
-        try:
-            self.conn = sqlite3.connect(self.db_file, check_same_thread=False)
-            self.conn.row_factory = sqlite3.Row
-            self.cursor = self.conn.cursor()
-        except sqlite3.DatabaseError as e:
-            self._log(f"Database error connecting to {self.db_file}: {str(e)}\n{traceback.format_exc()}", "ERROR")
-            raise
-        except Exception as e:
-            self._log(f"Unexpected error connecting to database: {str(e)}\n{traceback.format_exc()}", "ERROR")
-            raise
-
-    def reconnect(self):
-        with self.lock:
-            try:
-                if self.conn:
-                    self.conn.close()
-                self.connect()
-                self.optimize_settings()
-            except sqlite3.DatabaseError as e:
-                self._log(f"Database error reconnecting: {str(e)}\n{traceback.format_exc()}", "ERROR")
-                raise
-            except Exception as e:
-                self._log(f"Unexpected error reconnecting: {str(e)}\n{traceback.format_exc()}", "ERROR")
-                raise
-
-    def optimize_settings(self):
-        try:
-            if not self.conn or not self.cursor:
-                raise ValueError("Database connection not established")
-            self.cursor.execute("PRAGMA foreign_keys = ON;")
-            self.cursor.execute("PRAGMA journal_mode = WAL;")
-            self.cursor.execute("PRAGMA synchronous = NORMAL;")
-            self.cursor.execute("PRAGMA temp_store = MEMORY;")
-            self.conn.commit()
-        except sqlite3.OperationalError as e:
-            self._log(f"Operational error optimizing settings: {str(e)}\n{traceback.format_exc()}", "ERROR")
-            self.reconnect()
-            raise
-        except Exception as e:
-            self._log(f"Unexpected error optimizing settings: {str(e)}\n{traceback.format_exc()}", "ERROR")
-            raise
-
-    def create_tables(self):
-        try:
-            if not self.conn or not self.cursor:
-                raise ValueError("Database connection not established")
-
-            self.cursor.execute("""
-                CREATE TABLE IF NOT EXISTS accounts (
-                    fb_id TEXT PRIMARY KEY CHECK(fb_id != ''),
-                    password TEXT NOT NULL CHECK(password != ''),
-                    email TEXT NOT NULL CHECK(email != ''),
-                    proxy TEXT,
-                    access_token TEXT,
-                    cookies TEXT,
-                    status TEXT DEFAULT 'Not Logged In' CHECK(status IN ('Not Logged In', 'Logged In', 'Banned')),
-                    last_login TEXT DEFAULT CURRENT_TIMESTAMP,
-                    login_attempts INTEGER DEFAULT 0 CHECK(login_attempts >= 0),
-                    is_developer INTEGER DEFAULT 0 CHECK(is_developer IN (0, 1))
-                )
-            """)
-
-            self.cursor.execute("""
-                CREATE TABLE IF NOT EXISTS groups (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    account_id TEXT NOT NULL,
-                    group_id TEXT NOT NULL CHECK(group_id != ''),
-                    group_name TEXT NOT NULL CHECK(group_name != ''),
-                    privacy INTEGER DEFAULT 0 CHECK(privacy IN (0, 1)),
-                    created_time TEXT DEFAULT CURRENT_TIMESTAMP,
-                    description TEXT,
-                    administrator TEXT DEFAULT 'false' CHECK(administrator IN ('true', 'false')),
-                    member_count INTEGER DEFAULT 0 CHECK(member_count >= 0),
-                    status TEXT DEFAULT 'Active' CHECK(status IN ('Active', 'Inactive')),
-                    last_interaction TEXT DEFAULT CURRENT_TIMESTAMP,
-                    UNIQUE(account_id, group_id),
-                    FOREIGN KEY (account_id) REFERENCES accounts(fb_id) ON DELETE CASCADE
-                )
-            """)
-
-            self.cursor.execute("""
-                CREATE TABLE IF NOT EXISTS logs (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    fb_id TEXT,
-                    target TEXT,
-                    action TEXT NOT NULL CHECK(action != ''),
-                    timestamp TEXT DEFAULT CURRENT_TIMESTAMP,
-                    status TEXT NOT NULL CHECK(status IN ('Success', 'Failed', 'Warning')),
-                    details TEXT,
-                    FOREIGN KEY (fb_id) REFERENCES accounts(fb_id) ON DELETE SET NULL
-                )
-            """)
-
-            self.cursor.execute("""
-                CREATE TABLE IF NOT EXISTS scheduled_posts (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    fb_id TEXT NOT NULL,
-                    content TEXT NOT NULL CHECK(content != ''),
-                    time TEXT NOT NULL CHECK(time != ''),
-                    account_id TEXT,
-                    group_id TEXT,
-                    post_type TEXT DEFAULT 'Text' CHECK(post_type IN ('Text', 'Media')),
-                    status TEXT DEFAULT 'Pending' CHECK(status IN ('Pending', 'Posted')),
-                    FOREIGN KEY (fb_id) REFERENCES accounts(fb_id) ON DELETE CASCADE,
-                    FOREIGN KEY (account_id, group_id) REFERENCES groups(account_id, group_id) ON DELETE SET NULL
-                )
-            """)
-
-            self.cursor.execute("""
-                CREATE TABLE IF NOT EXISTS saved_posts (
-                    post_id TEXT PRIMARY KEY CHECK(post_id != ''),
-                    fb_id TEXT,
-                    content TEXT NOT NULL CHECK(content != ''),
-                    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-                    status TEXT DEFAULT 'Saved' CHECK(status IN ('Saved', 'Posted')),
-                    FOREIGN KEY (fb_id) REFERENCES accounts(fb_id) ON DELETE SET NULL
-                )
-            """)
-
-            self.cursor.execute("""
-                CREATE TABLE IF NOT EXISTS analytics (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    fb_id TEXT NOT NULL,
-                    group_id TEXT NOT NULL,
-                    posts_count INTEGER DEFAULT 0 CHECK(posts_count >= 0),
-                    engagement_score INTEGER DEFAULT 0 CHECK(engagement_score >= 0),
-                    invites_count INTEGER DEFAULT 0 CHECK(invites_count >= 0),
-                    last_updated TEXT DEFAULT CURRENT_TIMESTAMP,
-                    UNIQUE(fb_id, group_id),
-                    FOREIGN KEY (fb_id, group_id) REFERENCES groups(account_id, group_id) ON DELETE CASCADE
-                )
-            """)
-
-            self.conn.commit()
-            self.dbUpdated.emit()
-        except sqlite3.OperationalError as e:
-            self._log(f"Operational error creating tables: {str(e)}\n{traceback.format_exc()}", "ERROR")
-            self.reconnect()
-            raise
-        except Exception as e:
-            self._log(f"Unexpected error creating tables: {str(e)}\n{traceback.format_exc()}", "ERROR")
-            raise
-
-    def create_indexes(self):
-        try:
-            if not self.conn or not self.cursor:
-                raise ValueError("Database connection not established")
-            self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_accounts_status ON accounts(status)")
-            self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_groups_account_id ON groups(account_id)")
-            self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_groups_status ON groups(status)")
-            self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_logs_timestamp ON logs(timestamp)")
-            self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_logs_fb_id ON logs(fb_id)")
-            self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_scheduled_posts_time ON scheduled_posts(time)")
-            self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_saved_posts_created_at ON saved_posts(created_at)")
-            self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_analytics_fb_id ON analytics(fb_id)")
-            self.conn.commit()
-            self.dbUpdated.emit()
-        except sqlite3.OperationalError as e:
-            self._log(f"Operational error creating indexes: {str(e)}\n{traceback.format_exc()}", "ERROR")
-            self.reconnect()
-            raise
-        except Exception as e:
-            self._log(f"Unexpected error creating indexes: {str(e)}\n{traceback.format_exc()}", "ERROR")
-            raise
-
-    def close(self):
-        with self.lock:
-            try:
-                if self.conn:
-                    self.conn.commit()
-                    self.conn.close()
-                    self.conn = None
-                    self.cursor = None
-            except sqlite3.OperationalError as e:
-                self._log(f"Operational error closing connection: {str(e)}\n{traceback.format_exc()}", "ERROR")
-                raise
-            except Exception as e:
-                self._log(f"Unexpected error closing connection: {str(e)}\n{traceback.format_exc()}", "ERROR")
-                raise
-
-    def vacuum(self):
-        with self.lock:
-            try:
-                if not self.conn or not self.cursor:
-                    raise ValueError("Database connection not established")
-                self.cursor.execute("VACUUM;")
-                self.conn.commit()
-            except sqlite3.OperationalError as e:
-                self._log(f"Operational error during vacuum: {str(e)}\n{traceback.format_exc()}", "ERROR")
-                self.reconnect()
-                raise
-            except Exception as e:
-                self._log(f"Unexpected error during vacuum: {str(e)}\n{traceback.format_exc()}", "ERROR")
-                raise
-
-    def create_auto_backup(self):
-        with self.lock:
-            try:
-                self.backup_dir.mkdir(exist_ok=True)
-                backup_file = self.backup_dir / f"smart_poster_{datetime.now().strftime('%Y%m%d_%H%M%S')}.db"
-                shutil.copy2(self.db_file, backup_file)
-                self.cleanup_old_backups(max_backups=5)
-            except Exception as e:
-                self._log(f"Error creating auto-backup: {str(e)}\n{traceback.format_exc()}", "ERROR")
-                raise
-
-    def cleanup_old_backups(self, max_backups):
-        try:
-            backups = sorted(self.backup_dir.glob("smart_poster_*.db"), key=os.path.getmtime)
-            if len(backups) > max_backups:
-                for old_backup in backups[:-max_backups]:
-                    old_backup.unlink()
-        except Exception as e:
-            self._log(f"Error cleaning up backups: {str(e)}\n{traceback.format_exc()}", "ERROR")
-
-    def sanitize_input(self, value):
-        if value is None:
-            return ""
-        return str(value).replace("'", "''").replace(";", "")
-
-    def add_account(self, fb_id, password, email, proxy=None, access_token=None, is_developer=0):
-        with self.lock:
-            try:
-                if not self.conn or not self.cursor:
-                    raise ValueError("Database connection not established")
-                fb_id = self.sanitize_input(fb_id)
-                password = hashlib.sha256(self.sanitize_input(password).encode()).hexdigest()
-                email = self.sanitize_input(email)
-                proxy = self.sanitize_input(proxy) if proxy else None
-                access_token = self.sanitize_input(access_token) if access_token else None
-                if not fb_id or not password or not email:
-                    raise ValueError("fb_id, password, and email are required")
-                self.cursor.execute(
-                    "INSERT INTO accounts (fb_id, password, email, proxy, access_token, is_developer, status) "
-                    "VALUES (?, ?, ?, ?, ?, ?, 'Not Logged In') "
-                    "ON CONFLICT(fb_id) DO NOTHING",
-                    (fb_id, password, email, proxy, access_token, is_developer)
-                )
-                self.conn.commit()
-                self.dbUpdated.emit()
-            except sqlite3.IntegrityError as e:
-                self._log(f"Integrity error adding account {fb_id}: {str(e)}\n{traceback.format_exc()}", "ERROR", fb_id)
-                raise
-            except sqlite3.OperationalError as e:
-                self._log(f"Operational error adding account {fb_id}: {str(e)}\n{traceback.format_exc()}", "ERROR", fb_id)
-                self.reconnect()
-                raise
-            except Exception as e:
-                self._log(f"Unexpected error adding account {fb_id}: {str(e)}\n{traceback.format_exc()}", "ERROR", fb_id)
-                raise
-
-    def update_account(self, fb_id, password=None, email=None, proxy=None, cookies=None, access_token=None, status=None, last_login=None, login_attempts=None, is_developer=None):
-        with self.lock:
-            try:
-                if not self.conn or not self.cursor:
-                    raise ValueError("Database connection not established")
-                fb_id = self.sanitize_input(fb_id)
-                updates = []
-                params = []
-                if password is not None:
-                    updates.append("password = ?")
-                    params.append(hashlib.sha256(self.sanitize_input(password).encode()).hexdigest())
-                if email is not None:
-                    updates.append("email = ?")
-                    params.append(self.sanitize_input(email))
-                if proxy is not None:
-                    updates.append("proxy = ?")
-                    params.append(self.sanitize_input(proxy))
-                if cookies is not None:
-                    updates.append("cookies = ?")
-                    params.append(self.sanitize_input(cookies))
-                if access_token is not None:
-                    updates.append("access_token = ?")
-                    params.append(self.sanitize_input(access_token))
-                if status is not None:
-                    updates.append("status = ?")
-                    params.append(self.sanitize_input(status))
-                if last_login is not None:
-                    updates.append("last_login = ?")
-                    params.append(self.sanitize_input(last_login))
-                if login_attempts is not None:
-                    updates.append("login_attempts = ?")
-                    params.append(login_attempts)
-                if is_developer is not None:
-                    updates.append("is_developer = ?")
-                    params.append(is_developer)
-                if updates:
-                    query = "UPDATE accounts SET " + ", ".join(updates) + " WHERE fb_id = ?"
-                    params.append(fb_id)
-                    self.cursor.execute(query, params)
-                    self.conn.commit()
-                    self.dbUpdated.emit()
-            except sqlite3.OperationalError as e:
-                self._log(f"Operational error updating account {fb_id}: {str(e)}\n{traceback.format_exc()}", "ERROR", fb_id)
-                self.reconnect()
-                raise
-            except Exception as e:
-                self._log(f"Unexpected error updating account {fb_id}: {str(e)}\n{traceback.format_exc()}", "ERROR", fb_id)
-                raise
-
-    def delete_account(self, fb_id):
-        with self.lock:
-            try:
-                if not self.conn or not self.cursor:
-                    raise ValueError("Database connection not established")
-                fb_id = self.sanitize_input(fb_id)
-                self.cursor.execute("DELETE FROM accounts WHERE fb_id = ?", (fb_id,))
-                self.conn.commit()
-                self.vacuum()
-                self.dbUpdated.emit()
-            except sqlite3.OperationalError as e:
-                self._log(f"Operational error deleting account {fb_id}: {str(e)}\n{traceback.format_exc()}", "ERROR", fb_id)
-                self.reconnect()
-                raise
-            except Exception as e:
-                self._log(f"Unexpected error deleting account {fb_id}: {str(e)}\n{traceback.format_exc()}", "ERROR", fb_id)
-                raise
-
-    def get_accounts(self):
-        with self.lock:
-            try:
-                if not self.conn or not self.cursor:
-                    raise ValueError("Database connection not established")
-                self.cursor.execute("SELECT fb_id, email, proxy, access_token, status, last_login, login_attempts, is_developer FROM accounts")
-                return [tuple(row) for row in self.cursor.fetchall()]
-            except sqlite3.OperationalError as e:
-                self._log(f"Operational error getting accounts: {str(e)}\n{traceback.format_exc()}", "ERROR")
-                self.reconnect()
-                raise
-            except Exception as e:
-                self._log(f"Unexpected error getting accounts: {str(e)}\n{traceback.format_exc()}", "ERROR")
-                raise
-
-    def get_account(self, fb_id):
-        with self.lock:
-            try:
-                if not self.conn or not self.cursor:
-                    raise ValueError("Database connection not established")
-                fb_id = self.sanitize_input(fb_id)
-                self.cursor.execute(
-                    "SELECT fb_id, email, proxy, access_token, status, last_login, login_attempts, is_developer "
-                    "FROM accounts WHERE fb_id = ?", (fb_id,))
-                result = self.cursor.fetchone()
-                return tuple(result) if result else None
-            except sqlite3.OperationalError as e:
-                self._log(f"Operational error getting account {fb_id}: {str(e)}\n{traceback.format_exc()}", "ERROR", fb_id)
-                self.reconnect()
-                raise
-            except Exception as e:
-                self._log(f"Unexpected error getting account {fb_id}: {str(e)}\n{traceback.format_exc()}", "ERROR", fb_id)
-                raise
-
-    def add_group(self, account_id, group_id, group_name, privacy=0, created_time=None, description="", administrator="false", member_count=0, status="Active", last_interaction=None):
-        with self.lock:
-            try:
-                if not self.conn or not self.cursor:
-                    raise ValueError("Database connection not established")
-                account_id = self.sanitize_input(account_id)
-                group_id = self.sanitize_input(group_id)
-                group_name = self.sanitize_input(group_name)
-                description = self.sanitize_input(description)
-                administrator = self.sanitize_input(administrator)
-                created_time = created_time or datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                last_interaction = last_interaction or datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                self.cursor.execute(
-                    "INSERT OR REPLACE INTO groups "
-                    "(account_id, group_id, group_name, privacy, created_time, description, administrator, member_count, status, last_interaction) "
-                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
-                    (account_id, group_id, group_name, privacy, created_time, description, administrator, member_count, status, last_interaction)
-                )
-                self.conn.commit()
-                self.dbUpdated.emit()
-            except sqlite3.IntegrityError as e:
-                self._log(f"Integrity error adding group {group_id}: {str(e)}\n{traceback.format_exc()}", "ERROR", account_id)
-                raise
-            except sqlite3.OperationalError as e:
-                self._log(f"Operational error adding group {group_id}: {str(e)}\n{traceback.format_exc()}", "ERROR", account_id)
-                self.reconnect()
-                raise
-            except Exception as e:
-                self._log(f"Unexpected error adding group {group_id}: {str(e)}\n{traceback.format_exc()}", "ERROR", account_id)
-                raise
-
-    def get_groups(self, account_id=None):
-        with self.lock:
-            try:
-                if not self.conn or not self.cursor:
-                    raise ValueError("Database connection not established")
-                query = "SELECT id, account_id, group_id, group_name, privacy, created_time, description, administrator, member_count, status, last_interaction FROM groups"
-                params = []
-                if account_id:
-                    query += " WHERE account_id = ?"
-                    params.append(self.sanitize_input(account_id))
-                self.cursor.execute(query, params)
-                return [tuple(row) for row in self.cursor.fetchall()]
-            except sqlite3.OperationalError as e:
-                self._log(f"Operational error getting groups: {str(e)}\n{traceback.format_exc()}", "ERROR", account_id or "System")
-                self.reconnect()
-                raise
-            except Exception as e:
-                self._log(f"Unexpected error getting groups: {str(e)}\n{traceback.format_exc()}", "ERROR", account_id or "System")
-                raise
-
-    def add_log(self, fb_id, target, action, status, details=""):
-        with self.lock:
-            try:
-                if not self.conn or not self.cursor:
-                    raise ValueError("Database connection not established")
-                fb_id = self.sanitize_input(fb_id)
-                target = self.sanitize_input(target)
-                action = self.sanitize_input(action)
-                status = self.sanitize_input(status)
-                details = self.sanitize_input(details)
-                self.cursor.execute(
-                    "INSERT INTO logs (fb_id, target, action, status, details) "
-                    "VALUES (?, ?, ?, ?, ?)",
-                    (fb_id, target, action, status, details)
-                )
-                self.conn.commit()
-                self.dbUpdated.emit()
-            except sqlite3.OperationalError as e:
-                self._log(f"Operational error adding log: {str(e)}\n{traceback.format_exc()}", "ERROR", fb_id)
-                self.reconnect()
-                raise
-            except Exception as e:
-                self._log(f"Unexpected error adding log: {str(e)}\n{traceback.format_exc()}", "ERROR", fb_id)
-                raise
-
-    def get_logs(self, limit=100, fb_id=None, action=None):
-        with self.lock:
-            try:
-                if not self.conn or not self.cursor:
-                    raise ValueError("Database connection not established")
-                query = "SELECT id, fb_id, target, action, timestamp, status, details FROM logs"
-                params = []
-                conditions = []
-                if fb_id:
-                    conditions.append("fb_id = ?")
-                    params.append(self.sanitize_input(fb_id))
-                if action:
-                    conditions.append("action = ?")
-                    params.append(self.sanitize_input(action))
-                if conditions:
-                    query += " WHERE " + " AND ".join(conditions)
-                query += " ORDER BY timestamp DESC LIMIT ?"
-                params.append(limit)
-                self.cursor.execute(query, params)
-                logs = [tuple(row) for row in self.cursor.fetchall()]
-                if logs and len(logs) > 0:
-                    self.last_log_id = max(row[0] for row in logs)
-                return logs
-            except sqlite3.OperationalError as e:
-                self._log(f"Operational error getting logs: {str(e)}\n{traceback.format_exc()}", "ERROR")
-                self.reconnect()
-                raise
-            except Exception as e:
-                self._log(f"Unexpected error getting logs: {str(e)}\n{traceback.format_exc()}", "ERROR")
-                raise
-
-    def get_new_logs(self, last_log_id):
-        with self.lock:
-            try:
-                if not self.conn or not self.cursor:
-                    raise ValueError("Database connection not established")
-                self.cursor.execute(
-                    "SELECT id, fb_id, target, action, timestamp, status, details "
-                    "FROM logs WHERE id > ? ORDER BY timestamp DESC",
-                    (last_log_id,)
-                )
-                new_logs = [tuple(row) for row in self.cursor.fetchall()]
-                if new_logs and len(new_logs) > 0:
-                    self.last_log_id = max(row[0] for row in new_logs)
-                return new_logs
-            except sqlite3.OperationalError as e:
-                self._log(f"Operational error getting new logs: {str(e)}\n{traceback.format_exc()}", "ERROR")
-                self.reconnect()
-                raise
-            except Exception as e:
-                self._log(f"Unexpected error getting new logs: {str(e)}\n{traceback.format_exc()}", "ERROR")
-                raise
-
-    def add_scheduled_post(self, fb_id, content, time, group_id=None, post_type="Text", status="Pending"):
-        with self.lock:
-            try:
-                if not self.conn or not self.cursor:
-                    raise ValueError("Database connection not established")
-                fb_id = self.sanitize_input(fb_id)
-                content = self.sanitize_input(content)
-                time = self.sanitize_input(time)
-                group_id = self.sanitize_input(group_id) if group_id else None
-                post_type = self.sanitize_input(post_type)
-                status = self.sanitize_input(status)
-                self.cursor.execute(
-                    "INSERT INTO scheduled_posts (fb_id, content, time, account_id, group_id, post_type, status) "
-                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
-                    (fb_id, content, time, fb_id, group_id, post_type, status)
-                )
-                post_id = self.cursor.lastrowid
-                self.conn.commit()
-                self.dbUpdated.emit()
-                return post_id
-            except sqlite3.OperationalError as e:
-                self._log(f"Operational error adding scheduled post: {str(e)}\n{traceback.format_exc()}", "ERROR", fb_id)
-                self.reconnect()
-                raise
-            except Exception as e:
-                self._log(f"Unexpected error adding scheduled post: {str(e)}\n{traceback.format_exc()}", "ERROR", fb_id)
-                raise
-
-    def get_scheduled_posts(self):
-        with self.lock:
-            try:
-                if not self.conn or not self.cursor:
-                    raise ValueError("Database connection not established")
-                self.cursor.execute(
-                    "SELECT id, fb_id, content, time, account_id, group_id, post_type, status "
-                    "FROM scheduled_posts ORDER BY time ASC"
-                )
-                return [tuple(row) for row in self.cursor.fetchall()]
-            except sqlite3.OperationalError as e:
-                self._log(f"Operational error getting scheduled posts: {str(e)}\n{traceback.format_exc()}", "ERROR")
-                self.reconnect()
-                raise
-            except Exception as e:
-                self._log(f"Unexpected error getting scheduled posts: {str(e)}\n{traceback.format_exc()}", "ERROR")
-                raise
-
-    def update_scheduled_post_status(self, post_id, status):
-        with self.lock:
-            try:
-                if not self.conn or not self.cursor:
-                    raise ValueError("Database connection not established")
-                status = self.sanitize_input(status)
-                self.cursor.execute(
-                    "UPDATE scheduled_posts SET status = ? WHERE id = ?",
-                    (status, post_id)
-                )
-                self.conn.commit()
-                self.dbUpdated.emit()
-            except sqlite3.OperationalError as e:
-                self._log(f"Operational error updating scheduled post {post_id}: {str(e)}\n{traceback.format_exc()}", "ERROR")
-                self.reconnect()
-                raise
-            except Exception as e:
-                self._log(f"Unexpected error updating scheduled post {post_id}: {str(e)}\n{traceback.format_exc()}", "ERROR")
-                raise
-
-    def add_saved_post(self, post_id, fb_id, content, created_at=None, status="Saved"):
-        with self.lock:
-            try:
-                if not self.conn or not self.cursor:
-                    raise ValueError("Database connection not established")
-                post_id = hashlib.sha256(self.sanitize_input(post_id).encode()).hexdigest()
-                fb_id = self.sanitize_input(fb_id)
-                content = self.sanitize_input(content)
-                created_at = created_at or datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                status = self.sanitize_input(status)
-                self.cursor.execute(
-                    "INSERT OR REPLACE INTO saved_posts (post_id, fb_id, content, created_at, status) "
-                    "VALUES (?, ?, ?, ?, ?)",
-                    (post_id, fb_id, content, created_at, status)
-                )
-                self.conn.commit()
-                self.dbUpdated.emit()
-            except sqlite3.OperationalError as e:
-                self._log(f"Operational error adding saved post {post_id}: {str(e)}\n{traceback.format_exc()}", "ERROR", fb_id)
-                self.reconnect()
-                raise
-            except Exception as e:
-                self._log(f"Unexpected error adding saved post {post_id}: {str(e)}\n{traceback.format_exc()}", "ERROR", fb_id)
-                raise
-
-    def get_recent_posts(self, limit=100):
-        with self.lock:
-            try:
-                if not self.conn or not self.cursor:
-                    raise ValueError("Database connection not established")
-                self.cursor.execute(
-                    "SELECT post_id, fb_id, content, created_at, status "
-                    "FROM saved_posts ORDER BY created_at DESC LIMIT ?",
-                    (limit,)
-                )
-                return [tuple(row) for row in self.cursor.fetchall()]
-            except sqlite3.OperationalError as e:
-                self._log(f"Operational error getting recent posts: {str(e)}\n{traceback.format_exc()}", "ERROR")
-                self.reconnect()
-                raise
-            except Exception as e:
-                self._log(f"Unexpected error getting recent posts: {str(e)}\n{traceback.format_exc()}", "ERROR")
-                raise
-
-    def update_analytics(self, fb_id, group_id, posts_count, engagement_score, invites_count):
-        with self.lock:
-            try:
-                if not self.conn or not self.cursor:
-                    raise ValueError("Database connection not established")
-                fb_id = self.sanitize_input(fb_id)
-                group_id = self.sanitize_input(group_id)
-                self.cursor.execute(
-                    "INSERT OR REPLACE INTO analytics "
-                    "(fb_id, group_id, posts_count, engagement_score, invites_count, last_updated) "
-                    "VALUES (?, ?, ?, ?, ?, ?)",
-                    (fb_id, group_id, posts_count, engagement_score, invites_count, datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
-                )
-                self.conn.commit()
-                self.dbUpdated.emit()
-            except sqlite3.OperationalError as e:
-                self._log(f"Operational error updating analytics: {str(e)}\n{traceback.format_exc()}", "ERROR", fb_id)
-                self.reconnect()
-                raise
-            except Exception as e:
-                self._log(f"Unexpected error updating analytics: {str(e)}\n{traceback.format_exc()}", "ERROR", fb_id)
-                raise
-
-    def get_analytics(self, fb_id=None, group_id=None):
-        with self.lock:
-            try:
-                if not self.conn or not self.cursor:
-                    raise ValueError("Database connection not established")
-                query = "SELECT id, fb_id, group_id, posts_count, engagement_score, invites_count, last_updated FROM analytics"
-                params = []
-                conditions = []
-                if fb_id:
-                    conditions.append("fb_id = ?")
-                    params.append(self.sanitize_input(fb_id))
-                if group_id:
-                    conditions.append("group_id = ?")
-                    params.append(self.sanitize_input(group_id))
-                if conditions:
-                    query += " WHERE " + " AND ".join(conditions)
-                self.cursor.execute(query, params)
-                return [tuple(row) for row in self.cursor.fetchall()]
-            except sqlite3.OperationalError as e:
-                self._log(f"Operational error getting analytics: {str(e)}\n{traceback.format_exc()}", "ERROR")
-                self.reconnect()
-                raise
-            except Exception as e:
-                self._log(f"Unexpected error getting analytics: {str(e)}\n{traceback.format_exc()}", "ERROR")
-                raise
-
-    def cleanup_old_logs(self, days=30):
-        with self.lock:
-            try:
-                if not self.conn or not self.cursor:
-                    raise ValueError("Database connection not established")
-                cutoff_date = (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d %H:%M:%S")
-                self.cursor.execute("DELETE FROM logs WHERE timestamp < ?", (cutoff_date,))
-                self.conn.commit()
-                self.vacuum()
-                self.dbUpdated.emit()
-            except sqlite3.OperationalError as e:
-                self._log(f"Operational error cleaning up logs: {str(e)}\n{traceback.format_exc()}", "ERROR")
-                self.reconnect()
-                raise
-            except Exception as e:
-                self._log(f"Unexpected error cleaning up logs: {str(e)}\n{traceback.format_exc()}", "ERROR")
-                raise
-
-if __name__ == "__main__":
-    from PyQt5.QtWidgets import QApplication
-    import sys
-    app = QApplication(sys.argv)
-    class DummyApp:
-        pass
-    class DummyLogManager:
-        def add_log(self, fb_id, target, action, level, message):
-            print(f"[{level}] {action}: {message}")
-    db = Database(DummyApp(), log_manager=DummyLogManager())
-    db.add_account("fb1", "pass1", "email1@example.com")
-    db.add_group("fb1", "group1", "Test Group")
-    db.add_log("fb1", "group1", "Test Action", "Success")
-    print("Accounts:", db.get_accounts())
-    print("Groups:", db.get_groups("fb1"))
-    print("Logs:", db.get_logs(limit=10))
+import sqlite3
+import os
+import hashlib
+import traceback
+from datetime import datetime
+from PyQt5.QtCore import pyqtSignal, QObject
+from pathlib import Path
+import logging
+import logging.handlers
+import queue
+import time
+from collections import deque
+from threading import Lock, Thread
+from contextlib import contextmanager
+from functools import lru_cache
+from concurrent.futures import Future
+
+
+_now_cache = (0, "")
+
+def _now_str():
+    """طابع زمني بدقة الثانية؛ النداءات المتتالية داخل الثانية نفسها تعيد النص المخزّن دون تنسيق جديد."""
+    global _now_cache
+    t = int(time.time())
+    if t != _now_cache[0]:
+        _now_cache = (t, time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(t)))
+    return _now_cache[1]
+
+@lru_cache(maxsize=4096)
+def _hash_post_id(post_id):
+    """بصمة معرّف المنشور المحفوظ؛ الكاش يحوّل إعادة حفظ المعرّف نفسه إلى بحث قاموس بدل إعادة التجزئة."""
+    return hashlib.sha256(post_id.encode()).hexdigest()
+
+# نصوص SQL الثابتة في مكان واحد: السلسلة الواحدة بعينها تصيب كاش العبارات المُجهّزة في كل نداء
+SQL = {
+    "add_account": (
+        "INSERT INTO accounts (fb_id, password, email, proxy, access_token, is_developer, status) "
+        "VALUES (?, ?, ?, ?, ?, ?, 'Not Logged In') "
+        "ON CONFLICT(fb_id) DO NOTHING"
+    ),
+    "add_group": (
+        "INSERT OR REPLACE INTO groups "
+        "(account_id, group_id, group_name, privacy, created_time, description, administrator, member_count, status, last_interaction) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+    ),
+    "add_log": (
+        "INSERT INTO logs (fb_id, target, action, status, details) "
+        "VALUES (?, ?, ?, ?, ?)"
+    ),
+    "add_scheduled_post": (
+        "INSERT INTO scheduled_posts (fb_id, content, time, account_id, group_id, post_type, status) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?)"
+    ),
+    "add_saved_post": (
+        "INSERT OR REPLACE INTO saved_posts (post_id, fb_id, content, created_at, status) "
+        "VALUES (?, ?, ?, ?, ?)"
+    ),
+    "update_analytics": (
+        "INSERT OR REPLACE INTO analytics "
+        "(fb_id, group_id, posts_count, engagement_score, invites_count, last_updated) "
+        "VALUES (?, ?, ?, ?, ?, ?)"
+    ),
+    "update_login_state": (
+        "UPDATE accounts SET status = ?, last_login = COALESCE(?, last_login), "
+        "cookies = COALESCE(?, cookies), access_token = COALESCE(?, access_token), "
+        "is_developer = COALESCE(?, is_developer) WHERE fb_id = ?"
+    ),
+    "update_scheduled_post_status": "UPDATE scheduled_posts SET status = ? WHERE id = ?",
+    "delete_account": "DELETE FROM accounts WHERE fb_id = ?",
+    "delete_inactive_accounts": (
+        "DELETE FROM accounts WHERE last_login IS NOT NULL AND julianday('now') - julianday(last_login) > ?"
+    ),
+    "cleanup_old_logs": (
+        "DELETE FROM logs WHERE rowid IN (SELECT rowid FROM logs WHERE timestamp < ? LIMIT 5000)"
+    ),
+    "get_accounts": "SELECT fb_id, email, proxy, access_token, status, last_login, login_attempts, is_developer FROM accounts",
+    "get_account": (
+        "SELECT fb_id, email, proxy, access_token, status, last_login, login_attempts, is_developer "
+        "FROM accounts WHERE fb_id = ?"
+    ),
+    "get_new_logs": (
+        "SELECT id, fb_id, target, action, timestamp, status, details "
+        "FROM logs WHERE id > ? ORDER BY timestamp DESC"
+    ),
+    "get_scheduled_posts": (
+        "SELECT id, fb_id, content, time, account_id, group_id, post_type, status "
+        "FROM scheduled_posts ORDER BY time ASC"
+    ),
+    "get_pending_scheduled_posts": (
+        "SELECT id, fb_id, content, time, account_id, group_id, post_type, status "
+        "FROM scheduled_posts WHERE status = 'Pending' ORDER BY time ASC"
+    ),
+    "get_analytics": "SELECT id, fb_id, group_id, posts_count, engagement_score, invites_count, last_updated FROM analytics",
+    "get_recent_posts": (
+        "SELECT post_id, fb_id, content, created_at, status "
+        "FROM saved_posts ORDER BY created_at DESC LIMIT ?"
+    ),
+}
+
+# أشكال استعلام التحليلات الأربعة جاهزة مسبقاً بمفتاح (هل مرّر fb_id؟، هل مرّر group_id؟)
+# بدل تركيب WHERE نصياً عند كل نداء؛ السلاسل الثابتة نفسها تصيب كاش العبارات المُجهّزة
+_ANALYTICS_SQL = {
+    (False, False): SQL["get_analytics"],
+    (True, False): SQL["get_analytics"] + " WHERE fb_id = ?",
+    (False, True): SQL["get_analytics"] + " WHERE group_id = ?",
+    (True, True): SQL["get_analytics"] + " WHERE fb_id = ? AND group_id = ?",
+}
+
+
+class Database(QObject):
+    dbUpdated = pyqtSignal()
+    statusUpdated = pyqtSignal(str)
+    # دفع رقم آخر سجل مُدرج للواجهة بدل أن تستطلع get_new_logs دورياً بلا جديد
+    logsAdded = pyqtSignal(int)
+
+    # أعمدة update_account بالترتيب؛ القناع البتّي للحقول الممرَّرة هو مفتاح كاش نص الاستعلام.
+    # كلمات المرور تصل مشفّرة تشفيراً قابلاً للاسترجاع من مدير الحسابات (تسجيل الدخول يحتاج
+    # النص الأصلي) فتُخزَّن كما وصلت دون تجزئة
+    _UPDATE_COLS = (
+        "password",
+        "email",
+        "proxy",
+        "cookies",
+        "access_token",
+        "status",
+        "last_login",
+        "login_attempts",
+        "is_developer",
+    )
+
+    def __init__(self, app, db_file="smart_poster.db", log_manager=None):
+        super().__init__()
+        self.app = app
+        self.base_dir = Path(os.path.dirname(os.path.abspath(__file__)))
+        self.db_file = self.base_dir / db_file
+        self.backup_dir = self.base_dir / "backups"
+        self.log_manager = log_manager
+        # القفل يحمي اتصال الكتابة الوحيد فقط؛ القراءات تمضي بالتوازي عبر مجموعة اتصالات mode=ro
+        self.lock = Lock()
+        self.conn = None
+        self.cursor = None
+        self.last_log_id = 0
+        self._update_sql_cache = {}
+        # سجلات داخلية تنتظر خيط الكاتب؛ حلقة محدودة فلا يتضخم الاستهلاك لو تعطل التفريغ
+        self._log_ring = deque(maxlen=10000)
+        # دمج إشارات Qt: إرسال واحد كحد أقصى كل 50 مللي ثانية حتى لا توقظ دفعات الإدراج الواجهة لكل صف
+        self._db_update_pending = False
+        self._db_update_last = 0.0
+        self._status_last = 0.0
+
+        if not self.log_manager:
+            raise ValueError("LogManager is required for Database")
+
+        self.setup_logging()
+        self.connect()
+        self._wq = queue.Queue()
+        self._writer_thread = Thread(target=self._writer_loop, daemon=True)
+        self._writer_thread.start()
+        self.optimize_settings()
+        self.create_tables()
+        self.create_indexes()
+        self._read_pool = self._build_read_pool()
+        # النسخ الاحتياطي في الخلفية كي لا يتعلق زمن الإقلاع بحجم القاعدة
+        Thread(target=self.create_auto_backup, daemon=True).start()
+        Thread(target=self._optimize_loop, daemon=True).start()
+
+    def setup_logging(self):
+        self.logger = logging.getLogger(__name__)
+        if not self.logger.handlers:
+            handler = logging.handlers.RotatingFileHandler(
+                self.base_dir / "database.log",
+                maxBytes=10*1024*1024,
+                backupCount=5
+            )
+            handler.setFormatter(logging.Formatter("%(asctime)s - %(levelname)s - %(message)s"))
+            self.logger.addHandler(handler)
+            self.logger.setLevel(logging.INFO)
+
+    def _log(self, message, level, fb_id="System", action="Database"):
+        try:
+            lvl = getattr(logging, level.upper(), logging.INFO)
+            # المشي على سلسلة الإطارات مكلف؛ لا نلتقط الأثر إلا عند الأخطاء
+            if lvl >= logging.ERROR:
+                message = f"{message} | Trace: {traceback.format_stack()[-2]}"
+            full_message = f"{datetime.now().isoformat()} | {message}"
+            # إلحاق بالحلقة بدل نداء متزامن قد يعود إلينا بإدراج تحت القفل؛ خيط الكاتب يفرغها ضمن معاملاته
+            status = {"info": "Success", "warning": "Warning"}.get(level.lower(), "Failed")
+            was_idle = not self._log_ring
+            self._log_ring.append((fb_id or "", "", action, status, full_message))
+            # الكاتب قد يكون رابضاً على طابور فارغ بلا مهلة؛ رمز إيقاظ يضمن تفريغ الحلقة
+            # قريباً بدل انتظار كتابة أخرى قد لا تأتي (getattr لأن _log قد يُستدعى قبل إنشاء الطابور)
+            wq = getattr(self, "_wq", None)
+            if was_idle and wq is not None:
+                wq.put((None, None, None))
+            if self.logger.isEnabledFor(lvl):
+                self.logger.log(lvl, full_message)
+            now = time.monotonic()
+            if now - self._status_last >= 0.05:
+                self._status_last = now
+                self.statusUpdated.emit(f"{level}: {message}")
+        except Exception as e:
+            print(f"Error logging in Database: {str(e)}\n{traceback.format_exc()}")
+
+    def connect(self):
+        try:
+            # isolation_level=None يجعل التحكم في المعاملات صريحاً عبر BEGIN/COMMIT بدل بدء معاملة ضمنية لكل أمر
+            self.conn = sqlite3.connect(self.db_file, check_same_thread=False, isolation_level=None, cached_statements=512)
+            self.conn.row_factory = sqlite3.Row
+            self.cursor = self.conn.cursor()
+        except sqlite3.DatabaseError as e:
+            self._log(f"Database error connecting to {self.db_file}: {str(e)}\n{traceback.format_exc()}", "ERROR")
+            raise
+        except Exception as e:
+            self._log(f"Unexpected error connecting to database: {str(e)}\n{traceback.format_exc()}", "ERROR")
+            raise
+
+    def reconnect(self):
+        with self.lock:
+            try:
+                if self.conn:
+                    self.conn.close()
+                self.connect()
+                self.optimize_settings()
+            except sqlite3.DatabaseError as e:
+                self._log(f"Database error reconnecting: {str(e)}\n{traceback.format_exc()}", "ERROR")
+                raise
+            except Exception as e:
+                self._log(f"Unexpected error reconnecting: {str(e)}\n{traceback.format_exc()}", "ERROR")
+                raise
+
+    def _build_read_pool(self, size=4):
+        """تجهيز اتصالات قراءة فقط؛ في وضع WAL يقرأ القرّاء بالتوازي دون انتظار قفل الكاتب."""
+        pool = queue.Queue()
+        for _ in range(size):
+            conn = sqlite3.connect(f"file:{self.db_file}?mode=ro", uri=True, check_same_thread=False, cached_statements=512)
+            # بدون row_factory: صفوف tuple خام أرخص من تغليف Row الذي لا يستعمله المستهلكون
+            conn.execute("PRAGMA query_only = 1;")
+            conn.execute("PRAGMA mmap_size = 10737418240;")
+            conn.execute("PRAGMA busy_timeout = 5000;")
+            pool.put(conn)
+        return pool
+
+    def _optimize_loop(self):
+        """تحديث إحصاءات مخطِّط الاستعلامات دورياً كي لا تبقى الخطط مبنية على إحصاءات قديمة بين التشغيلات."""
+        while True:
+            time.sleep(900)
+            try:
+                with self.lock:
+                    if not self.conn:
+                        return
+                    self._settle_writer()
+                    self.conn.execute("PRAGMA optimize;")
+            except Exception as e:
+                self._log(f"Error running periodic optimize: {str(e)}", "WARNING")
+
+    def _schedule_update(self):
+        """إرسال dbUpdated فوراً إن مرّ وقت كافٍ منذ آخر إرسال، وإلا تعليمه كمؤجل."""
+        now = time.monotonic()
+        if now - self._db_update_last >= 0.05:
+            self._db_update_last = now
+            self._db_update_pending = False
+            self.dbUpdated.emit()
+        else:
+            self._db_update_pending = True
+
+    def _flush_pending_update(self):
+        if self._db_update_pending:
+            self._db_update_pending = False
+            self._db_update_last = time.monotonic()
+            self.dbUpdated.emit()
+
+    def _writer_loop(self):
+        """خيط كاتب وحيد يبقي المعاملة مفتوحة أثناء الدفقات: يثبّت عندما يهدأ الطابور 50 مللي ثانية
+        أو عند تجاوز 500 كتابة غير مثبتة، فيُستهلك fsync على الدفقة كلها بدل كل صف."""
+        dirty = 0
+        log_rowid = None
+
+        def drain_ring():
+            nonlocal dirty, log_rowid
+            while self._log_ring:
+                row = self._log_ring.popleft()
+                try:
+                    with self.lock:
+                        if not self.conn.in_transaction:
+                            self.conn.execute("BEGIN IMMEDIATE")
+                        cur = self.conn.execute(SQL["add_log"], row)
+                        log_rowid = cur.lastrowid
+                    dirty += 1
+                except Exception as e:
+                    print(f"Error draining internal log ring: {str(e)}")
+
+        def commit_dirty():
+            nonlocal dirty, log_rowid
+            with self.lock:
+                # قد يكون خيط آخر ثبّت الدفعة عبر _settle_writer قبل معاملة مباشرة له
+                if self.conn.in_transaction:
+                    self.conn.commit()
+            dirty = 0
+            self._schedule_update()
+            if log_rowid is not None:
+                self.logsAdded.emit(log_rowid)
+                log_rowid = None
+
+        while True:
+            try:
+                item = self._wq.get(timeout=0.05 if (dirty or self._log_ring) else None)
+            except queue.Empty:
+                drain_ring()
+                commit_dirty()
+                self._flush_pending_update()
+                continue
+            if item is None:
+                drain_ring()
+                if dirty:
+                    commit_dirty()
+                return
+            sql, params, fut = item
+            if sql is None:
+                if fut is None:
+                    # رمز إيقاظ من _log: يكفي الخروج من get ليُعاد تقييم المهلة فتُفرَّغ الحلقة وتُثبَّت
+                    continue
+                # حاجز flush: لا يُحلّ الوعد إلا بعد تثبيت كل ما سبقه
+                if dirty:
+                    commit_dirty()
+                fut.set_result(None)
+                continue
+            try:
+                with self.lock:
+                    if not self.conn.in_transaction:
+                        self.conn.execute("BEGIN IMMEDIATE")
+                    # نقطة حفظ لكل كتابة حتى لا يُسقط فشل واحدة كتابات سابقة حُلّت وعودها
+                    self.conn.execute("SAVEPOINT w")
+                    try:
+                        cur = self.conn.execute(sql, params)
+                        self.conn.execute("RELEASE w")
+                    except Exception:
+                        self.conn.execute("ROLLBACK TO w")
+                        self.conn.execute("RELEASE w")
+                        raise
+                    if sql is SQL["add_log"]:
+                        log_rowid = cur.lastrowid
+            except Exception as e:
+                fut.set_exception(e)
+                continue
+            dirty += 1
+            fut.set_result(None)
+            if dirty >= 500:
+                commit_dirty()
+
+    def _submit_write(self, sql, params):
+        """وضع كتابة في طابور الكاتب وانتظار تنفيذها؛ التثبيت على القرص يتبع سياسة الخيط الكاتب."""
+        fut = Future()
+        self._wq.put((sql, params, fut))
+        return fut.result()
+
+    def flush(self):
+        """حاجز مزامنة: يعود بعد تثبيت كل الكتابات السابقة على القرص."""
+        fut = Future()
+        self._wq.put((None, None, fut))
+        return fut.result()
+
+    def _settle_writer(self):
+        """يُستدعى والقفل محجوز قبل أي عمل مباشر على اتصال الكتابة: يثبّت دفعة الخيط الكاتب
+        المفتوحة إن وُجدت حتى لا تتداخل معاملتان على الاتصال المشترك. انتظار flush() هنا
+        يسبّب جموداً لأن المستدعي يحمل القفل الذي يحتاجه الكاتب نفسه للتثبيت."""
+        if self.conn is not None and self.conn.in_transaction:
+            self.conn.commit()
+
+    @contextmanager
+    def _reader(self):
+        conn = self._read_pool.get()
+        try:
+            yield conn
+        finally:
+            self._read_pool.put(conn)
+
+    def optimize_settings(self):
+        try:
+            if not self.conn or not self.cursor:
+                raise ValueError("Database connection not established")
+            # حجم الصفحة وauto_vacuum لا يسريان إلا على قاعدة فارغة (قبل إنشاء أي جدول) أو بعد VACUUM
+            if self.cursor.execute("PRAGMA page_count;").fetchone()[0] == 0:
+                self.cursor.execute("PRAGMA page_size = 8192;")
+                self.cursor.execute("PRAGMA auto_vacuum = INCREMENTAL;")
+            self.cursor.execute("PRAGMA foreign_keys = ON;")
+            self.cursor.execute("PRAGMA journal_mode = WAL;")
+            self.cursor.execute("PRAGMA synchronous = NORMAL;")
+            self.cursor.execute("PRAGMA temp_store = MEMORY;")
+            self.cursor.execute("PRAGMA cache_size = -65536;")
+            # قراءة الصفحات الساخنة عبر mmap بدل pread وتقييد نمو ملف WAL وانتظار القفل بدل الفشل الفوري
+            self.cursor.execute("PRAGMA mmap_size = 10737418240;")
+            self.cursor.execute("PRAGMA wal_autocheckpoint = 1000;")
+            self.cursor.execute("PRAGMA busy_timeout = 5000;")
+            self.conn.commit()
+        except sqlite3.OperationalError as e:
+            self._log(f"Operational error optimizing settings: {str(e)}\n{traceback.format_exc()}", "ERROR")
+            self.reconnect()
+            raise
+        except Exception as e:
+            self._log(f"Unexpected error optimizing settings: {str(e)}\n{traceback.format_exc()}", "ERROR")
+            raise
+
+    def create_tables(self):
+        try:
+            if not self.conn or not self.cursor:
+                raise ValueError("Database connection not established")
+
+            self.cursor.execute("""
+                CREATE TABLE IF NOT EXISTS accounts (
+                    fb_id TEXT PRIMARY KEY CHECK(fb_id != ''),
+                    password TEXT NOT NULL CHECK(password != ''),
+                    email TEXT NOT NULL CHECK(email != ''),
+                    proxy TEXT,
+                    access_token TEXT,
+                    cookies TEXT,
+                    status TEXT DEFAULT 'Not Logged In' CHECK(status IN ('Not Logged In', 'Logged In', 'Banned')),
+                    last_login TEXT DEFAULT CURRENT_TIMESTAMP,
+                    login_attempts INTEGER DEFAULT 0 CHECK(login_attempts >= 0),
+                    is_developer INTEGER DEFAULT 0 CHECK(is_developer IN (0, 1))
+                ) WITHOUT ROWID
+            """)
+
+            self.cursor.execute("""
+                CREATE TABLE IF NOT EXISTS groups (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    account_id TEXT NOT NULL,
+                    group_id TEXT NOT NULL CHECK(group_id != ''),
+                    group_name TEXT NOT NULL CHECK(group_name != ''),
+                    privacy INTEGER DEFAULT 0 CHECK(privacy IN (0, 1)),
+                    created_time TEXT DEFAULT CURRENT_TIMESTAMP,
+                    description TEXT,
+                    administrator TEXT DEFAULT 'false' CHECK(administrator IN ('true', 'false')),
+                    member_count INTEGER DEFAULT 0 CHECK(member_count >= 0),
+                    status TEXT DEFAULT 'Active' CHECK(status IN ('Active', 'Inactive')),
+                    last_interaction TEXT DEFAULT CURRENT_TIMESTAMP,
+                    UNIQUE(account_id, group_id),
+                    FOREIGN KEY (account_id) REFERENCES accounts(fb_id) ON DELETE CASCADE
+                )
+            """)
+
+            self.cursor.execute("""
+                CREATE TABLE IF NOT EXISTS logs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    fb_id TEXT,
+                    target TEXT,
+                    action TEXT NOT NULL CHECK(action != ''),
+                    timestamp TEXT DEFAULT CURRENT_TIMESTAMP,
+                    status TEXT NOT NULL CHECK(status IN ('Success', 'Failed', 'Warning')),
+                    details TEXT,
+                    FOREIGN KEY (fb_id) REFERENCES accounts(fb_id) ON DELETE SET NULL
+                )
+            """)
+
+            self.cursor.execute("""
+                CREATE TABLE IF NOT EXISTS scheduled_posts (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    fb_id TEXT NOT NULL,
+                    content TEXT NOT NULL CHECK(content != ''),
+                    time TEXT NOT NULL CHECK(time != ''),
+                    account_id TEXT,
+                    group_id TEXT,
+                    post_type TEXT DEFAULT 'Text' CHECK(post_type IN ('Text', 'Media')),
+                    status TEXT DEFAULT 'Pending' CHECK(status IN ('Pending', 'Posted')),
+                    FOREIGN KEY (fb_id) REFERENCES accounts(fb_id) ON DELETE CASCADE,
+                    FOREIGN KEY (account_id, group_id) REFERENCES groups(account_id, group_id) ON DELETE SET NULL
+                )
+            """)
+
+            self.cursor.execute("""
+                CREATE TABLE IF NOT EXISTS saved_posts (
+                    post_id TEXT PRIMARY KEY CHECK(post_id != ''),
+                    fb_id TEXT,
+                    content TEXT NOT NULL CHECK(content != ''),
+                    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                    status TEXT DEFAULT 'Saved' CHECK(status IN ('Saved', 'Posted')),
+                    FOREIGN KEY (fb_id) REFERENCES accounts(fb_id) ON DELETE SET NULL
+                )
+            """)
+
+            self.cursor.execute("""
+                CREATE TABLE IF NOT EXISTS analytics (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    fb_id TEXT NOT NULL,
+                    group_id TEXT NOT NULL,
+                    posts_count INTEGER DEFAULT 0 CHECK(posts_count >= 0),
+                    engagement_score INTEGER DEFAULT 0 CHECK(engagement_score >= 0),
+                    invites_count INTEGER DEFAULT 0 CHECK(invites_count >= 0),
+                    last_updated TEXT DEFAULT CURRENT_TIMESTAMP,
+                    UNIQUE(fb_id, group_id),
+                    FOREIGN KEY (fb_id, group_id) REFERENCES groups(account_id, group_id) ON DELETE CASCADE
+                )
+            """)
+
+            self.conn.commit()
+            self.dbUpdated.emit()
+        except sqlite3.OperationalError as e:
+            self._log(f"Operational error creating tables: {str(e)}\n{traceback.format_exc()}", "ERROR")
+            self.reconnect()
+            raise
+        except Exception as e:
+            self._log(f"Unexpected error creating tables: {str(e)}\n{traceback.format_exc()}", "ERROR")
+            raise
+
+    def create_indexes(self):
+        try:
+            if not self.conn or not self.cursor:
+                raise ValueError("Database connection not established")
+            self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_accounts_status ON accounts(status)")
+            self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_accounts_last_login ON accounts(last_login)")
+            self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_groups_account_id ON groups(account_id)")
+            self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_groups_status ON groups(status)")
+            self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_logs_timestamp ON logs(timestamp)")
+            self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_logs_fb_id ON logs(fb_id)")
+            self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_logs_fbid_id ON logs(fb_id, id DESC)")
+            self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_logs_action_ts ON logs(action, timestamp DESC)")
+            self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_scheduled_posts_time ON scheduled_posts(time)")
+            self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_scheduled_pending ON scheduled_posts(time) WHERE status='Pending'")
+            self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_saved_posts_created_at ON saved_posts(created_at)")
+            self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_saved_posts_recent ON saved_posts(created_at DESC, post_id, fb_id, status)")
+            self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_analytics_fb_id ON analytics(fb_id)")
+            self.conn.commit()
+            self.dbUpdated.emit()
+        except sqlite3.OperationalError as e:
+            self._log(f"Operational error creating indexes: {str(e)}\n{traceback.format_exc()}", "ERROR")
+            self.reconnect()
+            raise
+        except Exception as e:
+            self._log(f"Unexpected error creating indexes: {str(e)}\n{traceback.format_exc()}", "ERROR")
+            raise
+
+    def close(self):
+        self._wq.put(None)
+        self._writer_thread.join(timeout=5)
+        self._flush_pending_update()
+        with self.lock:
+            try:
+                while not self._read_pool.empty():
+                    self._read_pool.get_nowait().close()
+                if self.conn:
+                    self.conn.commit()
+                    # تحديث إحصاءات مخطِّط الاستعلامات قبل الإغلاق ليستفيد التشغيل التالي من الفهارس
+                    self.cursor.execute("PRAGMA optimize;")
+                    self.conn.close()
+                    self.conn = None
+                    self.cursor = None
+            except sqlite3.OperationalError as e:
+                self._log(f"Operational error closing connection: {str(e)}\n{traceback.format_exc()}", "ERROR")
+                raise
+            except Exception as e:
+                self._log(f"Unexpected error closing connection: {str(e)}\n{traceback.format_exc()}", "ERROR")
+                raise
+
+    def vacuum(self):
+        with self.lock:
+            try:
+                if not self.conn or not self.cursor:
+                    raise ValueError("Database connection not established")
+                self._settle_writer()
+                self.cursor.execute("VACUUM;")
+                self.conn.commit()
+            except sqlite3.OperationalError as e:
+                self._log(f"Operational error during vacuum: {str(e)}\n{traceback.format_exc()}", "ERROR")
+                self.reconnect()
+                raise
+            except Exception as e:
+                self._log(f"Unexpected error during vacuum: {str(e)}\n{traceback.format_exc()}", "ERROR")
+                raise
+
+    def create_auto_backup(self):
+        try:
+            self.backup_dir.mkdir(exist_ok=True)
+            backup_file = self.backup_dir / f"smart_poster_{datetime.now().strftime('%Y%m%d_%H%M%S')}.db"
+            # النسخ الاحتياطي الحي لـ SQLite يراعي WAL ويتنازل دورياً فلا يوقف الكتابة أثناء النسخ
+            dst = sqlite3.connect(str(backup_file))
+            try:
+                with dst:
+                    self.conn.backup(dst, pages=1000, sleep=0.001)
+            finally:
+                dst.close()
+            self.cleanup_old_backups(max_backups=5)
+        except Exception as e:
+            self._log(f"Error creating auto-backup: {str(e)}\n{traceback.format_exc()}", "ERROR")
+            raise
+
+    def cleanup_old_backups(self, max_backups):
+        try:
+            # اسم الملف يحمل الطابع الزمني YYYYMMDD_HHMMSS فالترتيب الأبجدي هو الترتيب الزمني دون نداء stat لكل ملف
+            backups = sorted(
+                (e for e in os.scandir(self.backup_dir)
+                 if e.name.startswith("smart_poster_") and e.name.endswith(".db")),
+                key=lambda e: e.name,
+            )
+            if len(backups) > max_backups:
+                for old_backup in backups[:-max_backups]:
+                    os.unlink(old_backup.path)
+        except Exception as e:
+            self._log(f"Error cleaning up backups: {str(e)}\n{traceback.format_exc()}", "ERROR")
+
+    @contextmanager
+    def transaction(self):
+        """معاملة صريحة واحدة لمجموعة كتابات: BEGIN IMMEDIATE ثم COMMIT، وROLLBACK عند الفشل.
+        تُستعمل والقفل محجوز، وتثبّت أولاً دفعة الخيط الكاتب المفتوحة إن وُجدت."""
+        self._settle_writer()
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield self.cursor
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+
+    def add_accounts_bulk(self, rows):
+        """إدراج دفعة حسابات (fb_id, password, email, proxy, access_token, is_developer) في معاملة واحدة.
+
+        كلمة المرور تصل من مدير الحسابات مشفّرة تشفيراً قابلاً للاسترجاع وتُخزَّن كما هي،
+        وfsync يحدث مرة واحدة للدفعة كلها.
+        """
+        if not rows:
+            return 0
+        prepared = []
+        for fb_id, password, email, proxy, access_token, is_developer in rows:
+            if not fb_id or not password or not email:
+                raise ValueError("fb_id, password, and email are required")
+            prepared.append((fb_id, password, email, proxy, access_token, is_developer))
+        with self.lock:
+            try:
+                if not self.conn or not self.cursor:
+                    raise ValueError("Database connection not established")
+                with self.transaction() as cur:
+                    cur.executemany(SQL["add_account"], prepared)
+                self._schedule_update()
+                return len(prepared)
+            except sqlite3.IntegrityError as e:
+                self._log(f"Integrity error adding accounts batch: {str(e)}\n{traceback.format_exc()}", "ERROR")
+                raise
+            except sqlite3.OperationalError as e:
+                self._log(f"Operational error adding accounts batch: {str(e)}\n{traceback.format_exc()}", "ERROR")
+                self.reconnect()
+                raise
+            except Exception as e:
+                self._log(f"Unexpected error adding accounts batch: {str(e)}\n{traceback.format_exc()}", "ERROR")
+                raise
+
+    def add_account(self, fb_id, password, email, proxy=None, access_token=None, is_developer=0):
+        if not fb_id or not password or not email:
+            raise ValueError("fb_id, password, and email are required")
+        try:
+            self._submit_write(
+                SQL["add_account"],
+                (fb_id, password, email, proxy or None, access_token or None, is_developer),
+            )
+        except sqlite3.IntegrityError as e:
+            self._log(f"Integrity error adding account {fb_id}: {str(e)}\n{traceback.format_exc()}", "ERROR", fb_id)
+            raise
+        except sqlite3.OperationalError as e:
+            self._log(f"Operational error adding account {fb_id}: {str(e)}\n{traceback.format_exc()}", "ERROR", fb_id)
+            self.reconnect()
+            raise
+        except Exception as e:
+            self._log(f"Unexpected error adding account {fb_id}: {str(e)}\n{traceback.format_exc()}", "ERROR", fb_id)
+            raise
+
+    def update_account(self, fb_id, password=None, email=None, proxy=None, cookies=None, access_token=None, status=None, last_login=None, login_attempts=None, is_developer=None):
+        try:
+            values = (password, email, proxy, cookies, access_token, status, last_login, login_attempts, is_developer)
+            mask = 0
+            params = []
+            for bit, value in enumerate(values):
+                if value is None:
+                    continue
+                mask |= 1 << bit
+                params.append(value)
+            if mask:
+                query = self._update_sql_cache.get(mask)
+                if query is None:
+                    cols = ", ".join(f"{name} = ?" for bit, name in enumerate(self._UPDATE_COLS) if mask & (1 << bit))
+                    query = self._update_sql_cache[mask] = f"UPDATE accounts SET {cols} WHERE fb_id = ?"
+                params.append(fb_id)
+                self._submit_write(query, params)
+        except sqlite3.OperationalError as e:
+            self._log(f"Operational error updating account {fb_id}: {str(e)}\n{traceback.format_exc()}", "ERROR", fb_id)
+            self.reconnect()
+            raise
+        except Exception as e:
+            self._log(f"Unexpected error updating account {fb_id}: {str(e)}\n{traceback.format_exc()}", "ERROR", fb_id)
+            raise
+
+    def update_login_states_bulk(self, rows):
+        """ترقية دفعة نتائج تسجيل الدخول (status, last_login, cookies, access_token, is_developer, fb_id)
+        في معاملة واحدة؛ القيم الفارغة تُبقي المخزَّن كما هو عبر COALESCE."""
+        if not rows:
+            return 0
+        with self.lock:
+            try:
+                if not self.conn or not self.cursor:
+                    raise ValueError("Database connection not established")
+                with self.transaction() as cur:
+                    cur.executemany(SQL["update_login_state"], rows)
+                self._schedule_update()
+                return len(rows)
+            except sqlite3.OperationalError as e:
+                self._log(f"Operational error updating login states batch: {str(e)}\n{traceback.format_exc()}", "ERROR")
+                self.reconnect()
+                raise
+            except Exception as e:
+                self._log(f"Unexpected error updating login states batch: {str(e)}\n{traceback.format_exc()}", "ERROR")
+                raise
+
+    def delete_account(self, fb_id):
+        with self.lock:
+            try:
+                if not self.conn or not self.cursor:
+                    raise ValueError("Database connection not established")
+                self._settle_writer()
+                self.cursor.execute(SQL["delete_account"], (fb_id,))
+                self.conn.commit()
+                self._schedule_update()
+            except sqlite3.OperationalError as e:
+                self._log(f"Operational error deleting account {fb_id}: {str(e)}\n{traceback.format_exc()}", "ERROR", fb_id)
+                self.reconnect()
+                raise
+            except Exception as e:
+                self._log(f"Unexpected error deleting account {fb_id}: {str(e)}\n{traceback.format_exc()}", "ERROR", fb_id)
+                raise
+
+    def delete_inactive_accounts(self, days=30):
+        with self.lock:
+            try:
+                if not self.conn or not self.cursor:
+                    raise ValueError("Database connection not established")
+                self._settle_writer()
+                self.cursor.execute(SQL["delete_inactive_accounts"], (days,))
+                deleted = self.cursor.rowcount
+                self.conn.commit()
+                if deleted:
+                    self._schedule_update()
+                return deleted
+            except sqlite3.OperationalError as e:
+                self._log(f"Operational error deleting inactive accounts: {str(e)}\n{traceback.format_exc()}", "ERROR")
+                self.reconnect()
+                raise
+            except Exception as e:
+                self._log(f"Unexpected error deleting inactive accounts: {str(e)}\n{traceback.format_exc()}", "ERROR")
+                raise
+
+    def get_accounts(self):
+        try:
+            with self._reader() as conn:
+                return conn.execute(SQL["get_accounts"]).fetchall()
+        except sqlite3.OperationalError as e:
+            self._log(f"Operational error getting accounts: {str(e)}\n{traceback.format_exc()}", "ERROR")
+            raise
+        except Exception as e:
+            self._log(f"Unexpected error getting accounts: {str(e)}\n{traceback.format_exc()}", "ERROR")
+            raise
+
+    def get_account(self, fb_id):
+        try:
+            with self._reader() as conn:
+                return conn.execute(SQL["get_account"], (fb_id,)).fetchone()
+        except sqlite3.OperationalError as e:
+            self._log(f"Operational error getting account {fb_id}: {str(e)}\n{traceback.format_exc()}", "ERROR", fb_id)
+            raise
+        except Exception as e:
+            self._log(f"Unexpected error getting account {fb_id}: {str(e)}\n{traceback.format_exc()}", "ERROR", fb_id)
+            raise
+
+    def add_group(self, account_id, group_id, group_name, privacy=0, created_time=None, description="", administrator="false", member_count=0, status="Active", last_interaction=None):
+        try:
+            created_time = created_time or _now_str()
+            last_interaction = last_interaction or _now_str()
+            self._submit_write(
+                SQL["add_group"],
+                (account_id, group_id, group_name, privacy, created_time, description, administrator, member_count, status, last_interaction)
+            )
+        except sqlite3.IntegrityError as e:
+            self._log(f"Integrity error adding group {group_id}: {str(e)}\n{traceback.format_exc()}", "ERROR", account_id)
+            raise
+        except sqlite3.OperationalError as e:
+            self._log(f"Operational error adding group {group_id}: {str(e)}\n{traceback.format_exc()}", "ERROR", account_id)
+            self.reconnect()
+            raise
+        except Exception as e:
+            self._log(f"Unexpected error adding group {group_id}: {str(e)}\n{traceback.format_exc()}", "ERROR", account_id)
+            raise
+
+    def get_groups(self, account_id=None):
+        try:
+            query = "SELECT id, account_id, group_id, group_name, privacy, created_time, description, administrator, member_count, status, last_interaction FROM groups"
+            params = []
+            if account_id:
+                query += " WHERE account_id = ?"
+                params.append(account_id)
+            with self._reader() as conn:
+                return conn.execute(query, params).fetchall()
+        except sqlite3.OperationalError as e:
+            self._log(f"Operational error getting groups: {str(e)}\n{traceback.format_exc()}", "ERROR", account_id or "System")
+            raise
+        except Exception as e:
+            self._log(f"Unexpected error getting groups: {str(e)}\n{traceback.format_exc()}", "ERROR", account_id or "System")
+            raise
+
+    def add_logs_bulk(self, rows):
+        """إدراج دفعة سجلات (fb_id, target, action, status, details) في معاملة واحدة وإشارة dbUpdated واحدة."""
+        if not rows:
+            return 0
+        with self.lock:
+            try:
+                if not self.conn or not self.cursor:
+                    raise ValueError("Database connection not established")
+                with self.transaction() as cur:
+                    cur.executemany(SQL["add_log"], rows)
+                    last_rowid = cur.lastrowid
+                self._schedule_update()
+                if last_rowid:
+                    self.logsAdded.emit(last_rowid)
+                return len(rows)
+            except sqlite3.OperationalError as e:
+                self._log(f"Operational error adding logs batch: {str(e)}\n{traceback.format_exc()}", "ERROR")
+                self.reconnect()
+                raise
+            except Exception as e:
+                self._log(f"Unexpected error adding logs batch: {str(e)}\n{traceback.format_exc()}", "ERROR")
+                raise
+
+    def add_log(self, fb_id, target, action, status, details=""):
+        try:
+            self._submit_write(
+                SQL["add_log"],
+                (fb_id or "", target or "", action, status, details or ""),
+            )
+        except sqlite3.OperationalError as e:
+            self._log(f"Operational error adding log: {str(e)}\n{traceback.format_exc()}", "ERROR", fb_id)
+            self.reconnect()
+            raise
+        except Exception as e:
+            self._log(f"Unexpected error adding log: {str(e)}\n{traceback.format_exc()}", "ERROR", fb_id)
+            raise
+
+    def get_logs(self, limit=100, fb_id=None, action=None):
+        try:
+            query = "SELECT id, fb_id, target, action, timestamp, status, details FROM logs"
+            params = []
+            conditions = []
+            if fb_id:
+                conditions.append("fb_id = ?")
+                params.append(fb_id)
+            if action:
+                conditions.append("action = ?")
+                params.append(action)
+            if conditions:
+                query += " WHERE " + " AND ".join(conditions)
+            query += " ORDER BY timestamp DESC LIMIT ?"
+            params.append(limit)
+            with self._reader() as conn:
+                cur = conn.execute(query, params)
+                cur.arraysize = 1000
+                logs = []
+                while True:
+                    chunk = cur.fetchmany()
+                    if not chunk:
+                        break
+                    logs.extend(chunk)
+            if logs:
+                # الترتيب تنازلي بالطابع الزمني ودقته ثانية واحدة، فقد تتساوى طوابع صفوف
+                # متعددة ولا يضمن أول صف أحدث معرّف؛ max يحمي العلامة المائية من التراجع
+                self.last_log_id = max(log[0] for log in logs)
+            return logs
+        except sqlite3.OperationalError as e:
+            self._log(f"Operational error getting logs: {str(e)}\n{traceback.format_exc()}", "ERROR")
+            raise
+        except Exception as e:
+            self._log(f"Unexpected error getting logs: {str(e)}\n{traceback.format_exc()}", "ERROR")
+            raise
+
+    def get_new_logs(self, last_log_id):
+        try:
+            with self._reader() as conn:
+                cur = conn.execute(SQL["get_new_logs"], (last_log_id,))
+                cur.arraysize = 1000
+                new_logs = []
+                while True:
+                    chunk = cur.fetchmany()
+                    if not chunk:
+                        break
+                    new_logs.extend(chunk)
+            if new_logs:
+                self.last_log_id = max(log[0] for log in new_logs)
+            return new_logs
+        except sqlite3.OperationalError as e:
+            self._log(f"Operational error getting new logs: {str(e)}\n{traceback.format_exc()}", "ERROR")
+            raise
+        except Exception as e:
+            self._log(f"Unexpected error getting new logs: {str(e)}\n{traceback.format_exc()}", "ERROR")
+            raise
+
+    def add_scheduled_post(self, fb_id, content, time, group_id=None, post_type="Text", status="Pending"):
+        with self.lock:
+            try:
+                if not self.conn or not self.cursor:
+                    raise ValueError("Database connection not established")
+                self._settle_writer()
+                group_id = group_id or None
+                self.cursor.execute(
+                    SQL["add_scheduled_post"],
+                    (fb_id, content, time, fb_id, group_id, post_type, status)
+                )
+                post_id = self.cursor.lastrowid
+                self.conn.commit()
+                self._schedule_update()
+                return post_id
+            except sqlite3.OperationalError as e:
+                self._log(f"Operational error adding scheduled post: {str(e)}\n{traceback.format_exc()}", "ERROR", fb_id)
+                self.reconnect()
+                raise
+            except Exception as e:
+                self._log(f"Unexpected error adding scheduled post: {str(e)}\n{traceback.format_exc()}", "ERROR", fb_id)
+                raise
+
+    def get_scheduled_posts(self):
+        try:
+            with self._reader() as conn:
+                return conn.execute(SQL["get_scheduled_posts"]).fetchall()
+        except sqlite3.OperationalError as e:
+            self._log(f"Operational error getting scheduled posts: {str(e)}\n{traceback.format_exc()}", "ERROR")
+            raise
+        except Exception as e:
+            self._log(f"Unexpected error getting scheduled posts: {str(e)}\n{traceback.format_exc()}", "ERROR")
+            raise
+
+    def get_pending_scheduled_posts(self):
+        """المنشورات المعلّقة فقط مرتبة بالوقت؛ تسير على الفهرس الجزئي فلا تمسح المنشورات المنجزة."""
+        try:
+            with self._reader() as conn:
+                return conn.execute(SQL["get_pending_scheduled_posts"]).fetchall()
+        except sqlite3.OperationalError as e:
+            self._log(f"Operational error getting pending scheduled posts: {str(e)}\n{traceback.format_exc()}", "ERROR")
+            raise
+        except Exception as e:
+            self._log(f"Unexpected error getting pending scheduled posts: {str(e)}\n{traceback.format_exc()}", "ERROR")
+            raise
+
+    def update_scheduled_post_status(self, post_id, status):
+        try:
+            self._submit_write(SQL["update_scheduled_post_status"], (status, post_id))
+        except sqlite3.OperationalError as e:
+            self._log(f"Operational error updating scheduled post {post_id}: {str(e)}\n{traceback.format_exc()}", "ERROR")
+            self.reconnect()
+            raise
+        except Exception as e:
+            self._log(f"Unexpected error updating scheduled post {post_id}: {str(e)}\n{traceback.format_exc()}", "ERROR")
+            raise
+
+    def add_saved_post(self, post_id, fb_id, content, created_at=None, status="Saved"):
+        post_id = _hash_post_id(post_id)
+        created_at = created_at or _now_str()
+        try:
+            self._submit_write(SQL["add_saved_post"], (post_id, fb_id, content, created_at, status))
+        except sqlite3.OperationalError as e:
+            self._log(f"Operational error adding saved post {post_id}: {str(e)}\n{traceback.format_exc()}", "ERROR", fb_id)
+            self.reconnect()
+            raise
+        except Exception as e:
+            self._log(f"Unexpected error adding saved post {post_id}: {str(e)}\n{traceback.format_exc()}", "ERROR", fb_id)
+            raise
+
+    def iter_recent_posts(self, limit=100):
+        """توليد المنشورات المحفوظة على دفعات من 512 صفاً بدل بناء القائمة كاملة في الذاكرة.
+
+        يحتجز اتصال قراءة من المجموعة حتى انتهاء التكرار أو إغلاق المولِّد.
+        """
+        try:
+            with self._reader() as conn:
+                cur = conn.execute(SQL["get_recent_posts"], (limit,))
+                cur.arraysize = 512
+                while True:
+                    chunk = cur.fetchmany()
+                    if not chunk:
+                        break
+                    yield from chunk
+        except sqlite3.OperationalError as e:
+            self._log(f"Operational error getting recent posts: {str(e)}\n{traceback.format_exc()}", "ERROR")
+            raise
+        except Exception as e:
+            self._log(f"Unexpected error getting recent posts: {str(e)}\n{traceback.format_exc()}", "ERROR")
+            raise
+
+    def get_recent_posts(self, limit=100):
+        return list(self.iter_recent_posts(limit))
+
+    def update_analytics(self, fb_id, group_id, posts_count, engagement_score, invites_count):
+        try:
+            self._submit_write(
+                SQL["update_analytics"],
+                (fb_id, group_id, posts_count, engagement_score, invites_count, _now_str())
+            )
+        except sqlite3.OperationalError as e:
+            self._log(f"Operational error updating analytics: {str(e)}\n{traceback.format_exc()}", "ERROR", fb_id)
+            self.reconnect()
+            raise
+        except Exception as e:
+            self._log(f"Unexpected error updating analytics: {str(e)}\n{traceback.format_exc()}", "ERROR", fb_id)
+            raise
+
+    def get_analytics(self, fb_id=None, group_id=None):
+        try:
+            query = _ANALYTICS_SQL[(bool(fb_id), bool(group_id))]
+            params = tuple(p for p in (fb_id, group_id) if p)
+            with self._reader() as conn:
+                return conn.execute(query, params).fetchall()
+        except sqlite3.OperationalError as e:
+            self._log(f"Operational error getting analytics: {str(e)}\n{traceback.format_exc()}", "ERROR")
+            raise
+        except Exception as e:
+            self._log(f"Unexpected error getting analytics: {str(e)}\n{traceback.format_exc()}", "ERROR")
+            raise
+
+    def cleanup_old_logs(self, days=30):
+        with self.lock:
+            try:
+                if not self.conn or not self.cursor:
+                    raise ValueError("Database connection not established")
+                self._settle_writer()
+                cutoff_date = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(time.time() - days * 86400))
+                deleted = 0
+                # حذف على دفعات محدودة مع تثبيت لكل دفعة حتى لا يحتجز حذف ضخم قفل الكتابة دفعة واحدة
+                while True:
+                    self.cursor.execute(SQL["cleanup_old_logs"], (cutoff_date,))
+                    chunk = self.cursor.rowcount
+                    self.conn.commit()
+                    deleted += chunk
+                    if chunk < 5000:
+                        break
+                # استرجاع تدريجي لعدد محدود من الصفحات بدل إعادة كتابة الملف كاملاً بـ VACUUM
+                self.cursor.execute("PRAGMA incremental_vacuum(1024);")
+                self._schedule_update()
+                return deleted
+            except sqlite3.OperationalError as e:
+                self._log(f"Operational error cleaning up logs: {str(e)}\n{traceback.format_exc()}", "ERROR")
+                self.reconnect()
+                raise
+            except Exception as e:
+                self._log(f"Unexpected error cleaning up logs: {str(e)}\n{traceback.format_exc()}", "ERROR")
+                raise
+
+if __name__ == "__main__":
+    from PyQt5.QtWidgets import QApplication
+    import sys
+    app = QApplication(sys.argv)
+    class DummyApp:
+        pass
+    class DummyLogManager:
+        def add_log(self, fb_id, target, action, level, message):
+            print(f"[{level}] {action}: {message}")
+    db = Database(DummyApp(), log_manager=DummyLogManager())
+    db.add_account("fb1", "pass1", "email1@example.com")
+    db.add_group("fb1", "group1", "Test Group")
+    db.add_log("fb1", "group1", "Test Action", "Success")
+    print("Accounts:", db.get_accounts())
+    print("Groups:", db.get_groups("fb1"))
+    print("Logs:", db.get_logs(limit=10))
     db.close()
\ No newline at end of file
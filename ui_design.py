@@ -1038,7 +1038,7 @@ class SmartPosterUI(QMainWindow):
             self._log(error_message, "Error")
             QMessageBox.critical(self, "UI Error", f"Error initializing UI: {str(e)}")
 
-        def connect_signals(self):
+    def connect_signals(self):
         """ربط الإشارات بالوظائف."""
         try:
             self.save_settings_button.clicked.connect(self.save_settings)
@@ -1100,11 +1100,12 @@ class SmartPosterUI(QMainWindow):
             self.analytics.statusUpdated.connect(self.update_status)
             self.analytics.progressUpdated.connect(self.update_progress)
             self.db.statusUpdated.connect(self.update_status)
+            # إشارة الدفع من قاعدة البيانات عند تثبيت سجلات جديدة تغني عن استطلاع الجدول دورياً
+            self.db.logsAdded.connect(lambda _rowid: self.update_logs_table())
             self.app.config_manager.statusUpdated.connect(self.update_status)
 
             # Timer for Periodic Updates
             self.timer = QTimer()
-            self.timer.timeout.connect(self.update_logs_table)
             self.timer.timeout.connect(self.update_scheduled_posts_table)
             self.timer.timeout.connect(self.update_stats_label)
             self.timer.start(5000)  # تحديث كل 5 ثوانٍ
@@ -1916,7 +1917,8 @@ class SmartPosterUI(QMainWindow):
                 self.logs_table.setItem(row, 6, QTableWidgetItem(details or ""))
             self.logs_table.resizeColumnsToContents()
             self.logs_page_label.setText(f"Page {self.logs_page + 1}")
-            self._log("Logs table updated", "Info")
+            # لا تسجيل للنجاح هنا: التحديث مدفوع بإشارة logsAdded، وتسجيل التحديث نفسه
+            # يولّد صفاً جديداً فيعيد إطلاق الإشارة في حلقة لا تنتهي
         except Exception as e:
             error_message = f"Error updating logs table: {str(e)}\n{traceback.format_exc()}"
             self._log(error_message, "Error")
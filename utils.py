@@ -7,6 +7,7 @@ import base64
 import subprocess
 import traceback
 import shutil
+from functools import lru_cache
 from typing import Dict, Optional, List, Callable, Any
 from selenium import webdriver
 from selenium.webdriver.common.by import By
@@ -282,11 +283,16 @@ def decrypt_data(encrypted_data: bytes, config_manager: Callable[[str, Optional[
     except Exception as e:
         raise Exception(f"Error decrypting data: {str(e)}\n{traceback.format_exc()}")
 
+@lru_cache(maxsize=8)
+def _derive_key(salt: bytes) -> bytes:
+    """اشتقاق مفتاح PBKDF2 مكلف (100k تكرار)، لذا يُشتق مرة واحدة لكل salt ويُعاد من الكاش."""
+    kdf = PBKDF2HMAC(algorithm=hashes.SHA256(), length=32, salt=salt, iterations=100000)
+    return base64.urlsafe_b64encode(kdf.derive(b"smart_poster_key"))
+
 def _generate_key(config_manager: Callable[[str, Optional[Any]], Any]) -> bytes:
     try:
         salt = config_manager.get("encryption_salt", b'smart_poster_salt').encode()
-        kdf = PBKDF2HMAC(algorithm=hashes.SHA256(), length=32, salt=salt, iterations=100000)
-        return base64.urlsafe_b64encode(kdf.derive(b"smart_poster_key"))
+        return _derive_key(salt)
     except Exception as e:
         raise Exception(f"Error generating encryption key: {str(e)}\n{traceback.format_exc()}")
 